@@ -1,14 +1,270 @@
+import time
+STARTED = time.perf_counter()  # Taken at module import; startup milestones are measured from here
+import os
 import sys
-import cv2
+import importlib
+import math
+import json
+import mmap
+import struct
 import pickle
-import matplotlib.pyplot as plt
-import numpy as np
+import hashlib
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache, partial
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, QPushButton, QFileDialog, QDialog, QHBoxLayout, QLabel, QSlider, QSpinBox, QLineEdit,
-    QInputDialog, QComboBox, QColorDialog, QAction, QSplashScreen, QCheckBox, QMessageBox, QListWidget, QListWidgetItem, QScrollArea
+    QComboBox, QColorDialog, QAction, QSplashScreen, QCheckBox, QMessageBox, QListWidget, QListWidgetItem, QScrollArea,
+    QProgressBar, QDockWidget
+)
+from PyQt5.QtCore import (
+    Qt, QRect, QSize, QPoint, QTimer, QPointF, QRectF, QObject, QRunnable, QThreadPool, pyqtSignal
+)
+from PyQt5.QtGui import (
+    QPixmap, QImage, QIcon, QPainter, QTransform, QColor, QPen, QPainterPath, QFont, QImageWriter, QFontMetrics, QMouseEvent,
+    QImageReader, QPolygonF
 )
-from PyQt5.QtCore import Qt, QRect, QSize, QPoint, QTimer, QPointF, QByteArray, QBuffer, QIODevice, QRectF
-from PyQt5.QtGui import QPixmap, QImage, QIcon, QPainter, QTransform, QColor, QPen, QPainterPath, QFont, QImageWriter
+
+# Seconds from import of this module to each startup milestone, plus how long each lazy import and the window build took
+startup_timings = OrderedDict()
+
+def mark_startup(name):
+    startup_timings[name] = time.perf_counter() - STARTED
+
+class LazyModule:
+    """Stand-in for a module that is only imported on first attribute access.
+
+    The import replaces the stand-in's global, so later lookups go straight
+    to the module.
+    """
+    def __init__(self, name, alias):
+        self.name = name
+        self.alias = alias
+        self.module = None
+
+    def __getattr__(self, attr):
+        if self.module is None:
+            started = time.perf_counter()
+            self.module = importlib.import_module(self.name)
+            startup_timings[f"import {self.name}"] = time.perf_counter() - started
+            globals()[self.alias] = self.module
+        return getattr(self.module, attr)
+
+# NumPy and OpenCV take longer to import than the rest; only image operations need them
+np = LazyModule("numpy", "np")
+cv2 = LazyModule("cv2", "cv2")
+mark_startup("imports")
+
+# Icons and the splash image ship next to this file, wherever it is started from
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+SPLASH_IMAGE = "fairy Tail.png"
+
+# Leads every packed element chunk; older chunks are bare JSON lists
+ELEMENT_CHUNK_MAGIC = b'FPE\x01'
+
+def asset_path(name):
+    return os.path.join(ASSET_DIR, name)
+
+@lru_cache(maxsize=None)
+def asset_icon(name, size=64):
+    """Icon from an asset PNG, decoded straight to size and kept in memory."""
+    reader = QImageReader(asset_path(name))
+    source = reader.size()
+    if source.isValid():
+        reader.setScaledSize(source.scaled(size, size, Qt.KeepAspectRatio))
+    return QIcon(QPixmap.fromImage(reader.read()))
+
+def argb32(image):
+    """Return image in a straight 32-bit format, converting only when it is not in one."""
+    if image.format() in (QImage.Format_RGB32, QImage.Format_ARGB32):
+        return image
+    if image.format() == QImage.Format_ARGB32_Premultiplied and image_array(image)[:, :, 3].min() == 255:
+        return image  # Opaque, so premultiplied and straight pixels are the same
+    return image.convertToFormat(QImage.Format_ARGB32)
+
+def premultiplied(image):
+    """Return image in ARGB32_Premultiplied, the format object pixels are kept in."""
+    if image.format() == QImage.Format_ARGB32_Premultiplied:
+        return image
+    return image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+class ImageBuffer:
+    """A QImage's pixels as a NumPy array interface; arrays over it hold the image as their base.
+
+    writable=True detaches the image first, so writes never leak into
+    other copies sharing the data.
+    """
+    def __init__(self, image, writable=False):
+        channels = image.depth() // 8
+        self.image = image
+        self.__array_interface__ = {
+            'version': 3,
+            'shape': (image.height(), image.width(), channels),
+            'typestr': '|u1',
+            'data': (int(image.bits() if writable else image.constBits()), not writable),
+            'strides': (image.bytesPerLine(), channels, 1),
+        }
+
+def image_array(image):
+    """View a 32-bit (or 24-bit) QImage's pixels as a read-only (h, w, 4) (or (h, w, 3)) uint8 array without copying.
+
+    Channels are in memory order, B, G, R, A for 32-bit formats, and rows
+    keep the image's bytesPerLine stride. The view keeps the image alive,
+    so it can be taken of a temporary such as argb32(image).
+    """
+    return np.asarray(ImageBuffer(image))
+
+def image_bytes(image):
+    """The pixel buffer of image as a read-only memoryview, without copying."""
+    bits = image.constBits()
+    bits.setsize(image.byteCount())
+    return memoryview(bits)
+
+def array_image(array, image_format=QImage.Format_ARGB32, borrow=False):
+    """QImage of an (h, w, 4) B, G, R, A uint8 array (or (h, w, 3) R, G, B for RGB888).
+
+    The pixels are copied into an image that owns them, so it and any
+    Qt copies of it are independent of the array. With borrow=True the
+    image reads the array in place instead; the array is kept on the
+    returned wrapper only, so shallow copies Qt makes (same-size
+    scaled(), same-format convertToFormat(), QImage(image)) must not
+    outlive it.
+    """
+    if not array.flags.c_contiguous:
+        array = np.ascontiguousarray(array)
+    image = QImage(array.data, array.shape[1], array.shape[0], array.strides[0], image_format)
+    if not borrow:
+        return image.copy()
+    image.ndarray = array
+    return image
+
+def bgr_image(bgr, alpha=None):
+    """Build an ARGB32 QImage from B, G, R channels and an optional alpha plane in one pass.
+
+    Without alpha the result is opaque and is labelled premultiplied,
+    which is then exact and needs no conversion later.
+    """
+    pixels = np.empty(bgr.shape[:2] + (4,), np.uint8)
+    pixels[:, :, :3] = bgr
+    if alpha is None:
+        pixels[:, :, 3] = 255
+        return array_image(pixels, QImage.Format_ARGB32_Premultiplied)
+    pixels[:, :, 3] = alpha
+    return array_image(pixels)
+
+@lru_cache(maxsize=512)
+def gamma_table(gamma):
+    """cv2.LUT table applying gamma to B, G and R while leaving alpha as is."""
+    values = ((np.arange(256) / 255.0) ** (1.0 / gamma) * 255).astype(np.uint8)
+    table = np.stack([values, values, values, np.arange(256, dtype=np.uint8)], axis=-1).reshape(1, 256, 4)
+    table.setflags(write=False)  # Shared between calls
+    return table
+
+def op_steps(ops):
+    """Group ops into (end, group) steps; runs of gamma and negative share one LUT pass."""
+    steps = []
+    for index, op in enumerate(ops):
+        if op[0] in ('gamma', 'negative') and steps and steps[-1][1][-1][0] in ('gamma', 'negative'):
+            steps[-1] = (index + 1, steps[-1][1] + [op])
+        else:
+            steps.append((index + 1, [op]))
+    return steps
+
+def decode_image(job, file_path, size):
+    """Read an image file and fit it to size; None if it cannot be read. Runs as a Job."""
+    image = cv2.imread(file_path)
+    if image is None or job.cancelled:
+        return None
+    job.report(50)
+    image = bgr_image(image)
+    # scaled() to the same size hands back a shallow copy that would outlive image's buffer
+    target = image.size().scaled(size, Qt.KeepAspectRatio)
+    return image if target == image.size() else image.scaled(target, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+def polyline_path(points):
+    """QPainterPath through an (N, 2) point array, filled in with one array copy."""
+    path = QPainterPath()
+    if len(points):
+        polygon = QPolygonF(len(points))
+        buffer = polygon.data()
+        buffer.setsize(len(points) * 16)  # QPointF is two doubles
+        np.frombuffer(buffer, np.float64).reshape(-1, 2)[:] = points
+        path.addPolygon(polygon)
+    return path
+
+def path_geometry(path):
+    """(N, 2) float64 points and (N,) uint8 QPainterPath element types of path, element for element."""
+    count = path.elementCount()
+    points = np.empty((count, 2), np.float64)
+    codes = np.empty(count, np.uint8)
+    for index in range(count):
+        element = path.elementAt(index)
+        points[index] = element.x, element.y
+        codes[index] = element.type
+    return points, codes
+
+def geometry_path(points, codes):
+    """Rebuild the QPainterPath path_geometry() described."""
+    if len(codes) and codes[0] == QPainterPath.MoveToElement and (codes[1:] == QPainterPath.LineToElement).all():
+        return polyline_path(points)  # Strokes and polygons
+    path = QPainterPath()
+    index = 0
+    while index < len(codes):
+        x, y = points[index]
+        if codes[index] == QPainterPath.MoveToElement:
+            path.moveTo(x, y)
+        elif codes[index] == QPainterPath.LineToElement:
+            path.lineTo(x, y)
+        elif codes[index] == QPainterPath.CurveToElement:
+            # A curve is its first control point followed by two data elements
+            path.cubicTo(QPointF(x, y), QPointF(*points[index + 1]), QPointF(*points[index + 2]))
+            index += 2
+        index += 1
+    return path
+
+def load_object_image(job, loader):
+    """Run an object's loader and bring its pixels into memory. Runs as a Job."""
+    image = loader()
+    if not image.isNull() and not job.cancelled:
+        # Touch one byte per page so a memory-mapped image is read off the GUI thread
+        np.asarray(image_bytes(image))[::mmap.PAGESIZE].max()
+    return image
+
+def merge_bgr_images(job, cv_images, orientation):
+    """Resize BGR images to a common height (side by side) or width (up and down) and join them. Runs as a Job."""
+    if orientation == "Side by Side":
+        target_height = min(img.shape[0] for img in cv_images)
+        resized_images = [
+            cv2.resize(img, (int(img.shape[1] * target_height / img.shape[0]), target_height)) for img in cv_images
+        ]
+        merged_image = cv2.hconcat(resized_images)  # Merge horizontally
+    elif orientation == "Up and Down":
+        target_width = min(img.shape[1] for img in cv_images)
+        resized_images = [
+            cv2.resize(img, (target_width, int(img.shape[0] * target_width / img.shape[1]))) for img in cv_images
+        ]
+        merged_image = cv2.vconcat(resized_images)  # Merge vertically
+    else:
+        return None
+    job.report(90)
+    return bgr_image(merged_image)
+
+def channel_histograms(job, image, rows=256):
+    """(3, 256) red, green and blue counts of image. Runs as a Job.
+
+    Each band of rows is counted with one bincount over all three
+    channels, offset into separate 256-bin ranges.
+    """
+    pixels = image_array(argb32(image))
+    offsets = np.array([512, 256, 0], dtype=np.uint16)  # B, G, R in memory
+    counts = np.zeros(768, dtype=np.int64)
+    for top in range(0, pixels.shape[0], rows):
+        if job.cancelled:
+            return None
+        job.report(100 * top // pixels.shape[0])
+        band = pixels[top:top + rows, :, :3] + offsets
+        counts += np.bincount(band.ravel(), minlength=768)
+    return counts.reshape(3, 256)
 
 class MergeDialog(QDialog):
     def __init__(self, objects):
@@ -65,7 +321,6 @@ class CanvasSettingsDialog(QDialog):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Create New Canvas")
-        self.setWindowIcon(QIcon(r'fairy tail.png'))
         self.setFixedSize(300, 250)
         
         # Main layout
@@ -80,10 +335,10 @@ class CanvasSettingsDialog(QDialog):
         layout.addWidget(QLabel("Width:"))
         width_layout = QHBoxLayout()
         self.width_slider = QSlider(Qt.Horizontal)
-        self.width_slider.setRange(100, 1600)
+        self.width_slider.setRange(100, 20000)
         self.width_slider.setValue(1200)
         self.width_spinbox = QSpinBox()
-        self.width_spinbox.setRange(100, 1600)
+        self.width_spinbox.setRange(100, 20000)
         self.width_spinbox.setValue(1200)
         self.width_slider.valueChanged.connect(self.width_spinbox.setValue)
         self.width_spinbox.valueChanged.connect(self.width_slider.setValue)
@@ -95,10 +350,10 @@ class CanvasSettingsDialog(QDialog):
         layout.addWidget(QLabel("Height:"))
         height_layout = QHBoxLayout()
         self.height_slider = QSlider(Qt.Horizontal)
-        self.height_slider.setRange(100, 1000)
+        self.height_slider.setRange(100, 20000)
         self.height_slider.setValue(800)
         self.height_spinbox = QSpinBox()
-        self.height_spinbox.setRange(100, 1000)
+        self.height_spinbox.setRange(100, 20000)
         self.height_spinbox.setValue(800)
         self.height_slider.valueChanged.connect(self.height_spinbox.setValue)
         self.height_spinbox.valueChanged.connect(self.height_slider.setValue)
@@ -119,11 +374,566 @@ class CanvasSettingsDialog(QDialog):
         height = self.height_spinbox.value()
         return project_name, width, height
 
+class PixmapCache:
+    """Least-recently-used pixmap (or QImage) cache bounded by the memory its entries use."""
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.entries = OrderedDict()
+
+    @staticmethod
+    def pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def get(self, key):
+        pixmap = self.entries.get(key)
+        if pixmap is not None:
+            self.entries.move_to_end(key)
+        return pixmap
+
+    def put(self, key, pixmap):
+        self.discard(key)
+        self.entries[key] = pixmap
+        self.used_bytes += self.pixmap_bytes(pixmap)
+        # Evict the least recently used entries, but always keep the newest one
+        while self.used_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.used_bytes -= self.pixmap_bytes(evicted)
+
+    def set_budget(self, max_bytes):
+        """Change the memory budget, evicting least recently used entries to fit."""
+        self.max_bytes = max_bytes
+        while self.used_bytes > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.used_bytes -= self.pixmap_bytes(evicted)
+
+    def discard(self, key):
+        pixmap = self.entries.pop(key, None)
+        if pixmap is not None:
+            self.used_bytes -= self.pixmap_bytes(pixmap)
+
+    def clear(self):
+        self.entries.clear()
+        self.used_bytes = 0
+
+class JobSignals(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+class Job(QRunnable):
+    """A function run on a pool thread as fn(job, *args).
+
+    fn may call job.report(percent) and should return early once
+    job.cancelled is set. Signals from a cancelled job are dropped.
+    """
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+        self.signals = JobSignals()
+
+    def report(self, percent):
+        if not self.cancelled:
+            self.signals.progress.emit(percent)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            result = self.fn(self, *self.args)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.failed.emit(str(e))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(result)
+
+class JobQueue(QObject):
+    """Runs Jobs on a QThreadPool with at most one live job per name.
+
+    Submitting under a name cancels the job it supersedes. Results are
+    handed to on_done on the GUI thread in one call, and only if the job
+    is still the current one for its name.
+    """
+    active_changed = pyqtSignal(int)  # Number of running jobs
+    progress = pyqtSignal(int)  # Progress of the most recently reporting job
+
+    def __init__(self, pool=None, parent=None):
+        super().__init__(parent)
+        # A private pool: Qt's global one also runs QImage scaling and conversion
+        # segments, which would wait on pool threads blocked on the GIL
+        self.pool = pool or QThreadPool(self)
+        self.jobs = {}
+
+    def submit(self, name, fn, *args, on_done=None, on_failed=None):
+        self.cancel(name)
+        job = Job(fn, *args)
+        self.jobs[name] = job
+        job.signals.progress.connect(self.progress.emit)
+        job.signals.finished.connect(lambda result: self.publish(name, job, result, on_done))
+        job.signals.failed.connect(lambda message: self.publish(name, job, message, on_failed))
+        self.pool.start(job)
+        self.active_changed.emit(len(self.jobs))
+        return job
+
+    def publish(self, name, job, result, callback):
+        if job.cancelled or self.jobs.get(name) is not job:
+            return  # Superseded while it ran
+        del self.jobs[name]
+        self.active_changed.emit(len(self.jobs))
+        if callback is not None:
+            callback(result)
+
+    def cancel(self, name):
+        job = self.jobs.pop(name, None)
+        if job is not None:
+            job.cancel()
+            self.active_changed.emit(len(self.jobs))
+
+    def cancel_all(self):
+        for name in list(self.jobs):
+            self.cancel(name)
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+class ProjectStore:
+    """A saved project: a JSON manifest plus a directory of content-addressed blobs.
+
+    The manifest is the .canvas file itself; blobs live next to it in
+    <name>.canvas.blobs, named by the SHA-256 of their bytes. Blobs are
+    immutable, so a save only writes those not already there and
+    identical content is stored once. Every file is written to a
+    temporary name and renamed into place, and the manifest goes last,
+    so an interrupted save leaves the previous project intact.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.blob_dir = path + ".blobs"
+
+    @staticmethod
+    def is_project(path):
+        # Manifests are JSON; older projects are a single pickle
+        with open(path, 'rb') as file:
+            return file.read(1) == b'{'
+
+    @staticmethod
+    def digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest)
+
+    def has_blob(self, digest):
+        return os.path.exists(self.blob_path(digest))
+
+    def put_blob(self, data, digest=None):
+        """Store data unless a blob with its digest exists; return the digest."""
+        digest = digest or self.digest(data)
+        if not self.has_blob(digest):
+            os.makedirs(self.blob_dir, exist_ok=True)
+            self.write_atomic(self.blob_path(digest), data)
+        return digest
+
+    def read_blob(self, digest):
+        with open(self.blob_path(digest), 'rb') as file:
+            return file.read()
+
+    def map_blob(self, digest):
+        """Read-only memory map of a blob; pages are only read from disk when touched."""
+        with open(self.blob_path(digest), 'rb') as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def map_image(self, digest, width, height):
+        """QImage over a memory-mapped raw premultiplied pixel blob, without copying."""
+        pixels = np.frombuffer(self.map_blob(digest), np.uint8).reshape(height, width, 4)
+        return array_image(pixels, QImage.Format_ARGB32_Premultiplied, borrow=True)
+
+    @staticmethod
+    def write_atomic(path, data):
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp-")
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def write_manifest(self, manifest):
+        self.write_atomic(self.path, json.dumps(manifest).encode('utf-8'))
+
+    def read_manifest(self):
+        with open(self.path, 'rb') as file:
+            return json.loads(file.read().decode('utf-8'))
+
+    def collect_garbage(self, digests):
+        """Delete blobs (and stray temporary files) not in digests."""
+        if not os.path.isdir(self.blob_dir):
+            return
+        for name in os.listdir(self.blob_dir):
+            if name not in digests:
+                try:
+                    os.unlink(os.path.join(self.blob_dir, name))
+                except OSError:
+                    pass  # Still mapped on platforms that lock open files; removed by a later save
+
+class SpatialGrid:
+    """Uniform grid of bounding boxes used for hit-testing and render culling.
+
+    Canvas items are plain dicts, so entries are keyed by id(). Queries
+    return items in insertion order, which is also their paint order.
+    """
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> set of item ids
+        self.entries = {}  # item id -> (order, rect, item)
+        self.next_order = 0
+
+    def cell_keys(self, rect):
+        size = self.cell_size
+        for column in range(rect.left() // size, rect.right() // size + 1):
+            for row in range(rect.top() // size, rect.bottom() // size + 1):
+                yield column, row
+
+    def insert(self, item, rect):
+        """Add an item, or move it if it is already indexed."""
+        key = id(item)
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry[1] == rect:
+                return
+            self.unlink(key, entry[1])
+            order = entry[0]
+        else:
+            order = self.next_order
+            self.next_order += 1
+        self.entries[key] = (order, QRect(rect), item)
+        for cell in self.cell_keys(rect):
+            self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, item):
+        entry = self.entries.pop(id(item), None)
+        if entry is not None:
+            self.unlink(id(item), entry[1])
+
+    def unlink(self, key, rect):
+        for cell in self.cell_keys(rect):
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.next_order = 0
+
+    def query(self, rect):
+        """Items whose bounds intersect rect, in paint order."""
+        keys = set()
+        for cell in self.cell_keys(rect):
+            keys.update(self.cells.get(cell, ()))
+        hits = [self.entries[key] for key in keys if self.entries[key][1].intersects(rect)]
+        return [item for _, _, item in sorted(hits, key=lambda entry: entry[0])]
+
+    def query_point(self, point):
+        """Items whose bounds contain point, in paint order."""
+        size = self.cell_size
+        keys = self.cells.get((point.x() // size, point.y() // size), ())
+        hits = [self.entries[key] for key in keys if self.entries[key][1].contains(point)]
+        return [item for _, _, item in sorted(hits, key=lambda entry: entry[0])]
+
+class TileStore:
+    """Document raster split into fixed-size tiles that exist only once needed.
+
+    Tiles live in view space: the document is shown at `scale`, so the
+    grid covers the document size times scale. A tile is allocated and
+    filled by render_tile(image, rect) the first time it is requested,
+    and re-rendered after mark_dirty. Only the most recently used
+    max_tiles are kept; evicted tiles are simply rendered again if they
+    are requested later.
+    """
+    def __init__(self, width, height, render_tile, scale=1.0, tile_size=256, max_tiles=256):
+        self.width = width
+        self.height = height
+        self.render_tile = render_tile
+        self.scale = scale
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()  # (column, row) -> QImage
+        self.dirty = set()
+
+    def rect(self):
+        """The whole view-space area covered by the tiles."""
+        return QRect(0, 0, math.ceil(self.width * self.scale), math.ceil(self.height * self.scale))
+
+    def to_view(self, rect):
+        """Smallest view-space rect covering a document rect."""
+        return QRectF(rect.x() * self.scale, rect.y() * self.scale,
+                      rect.width() * self.scale, rect.height() * self.scale).toAlignedRect()
+
+    def to_document(self, rect):
+        """Smallest document rect covering a view-space rect."""
+        return QRectF(rect.x() / self.scale, rect.y() / self.scale,
+                      rect.width() / self.scale, rect.height() / self.scale).toAlignedRect()
+
+    def begin_paint(self, image, tile_rect):
+        """Open a painter on a tile image that takes document coordinates."""
+        painter = QPainter(image)
+        painter.translate(-tile_rect.x(), -tile_rect.y())
+        painter.scale(self.scale, self.scale)
+        return painter
+
+    def tile_rect(self, key):
+        size = self.tile_size
+        return QRect(key[0] * size, key[1] * size, size, size).intersected(self.rect())
+
+    def tile_keys(self, rect):
+        """Keys of the tiles touching a view-space rect."""
+        rect = rect.intersected(self.rect())
+        if rect.isEmpty():
+            return []
+        size = self.tile_size
+        return [(column, row)
+                for row in range(rect.top() // size, rect.bottom() // size + 1)
+                for column in range(rect.left() // size, rect.right() // size + 1)]
+
+    def tile(self, key):
+        """Return a tile, allocating and rendering it first if needed."""
+        image = self.tiles.get(key)
+        if image is None:
+            image = QImage(self.tile_rect(key).size(), QImage.Format_ARGB32_Premultiplied)
+            self.tiles[key] = image
+            self.dirty.add(key)
+            while len(self.tiles) > self.max_tiles:
+                evicted, _ = self.tiles.popitem(last=False)
+                self.dirty.discard(evicted)
+        else:
+            self.tiles.move_to_end(key)
+        if key in self.dirty:
+            self.dirty.discard(key)
+            self.render_tile(image, self.tile_rect(key))
+        return image
+
+    def mark_dirty(self, rect=None):
+        """Flag the allocated tiles touching a document rect (all of them if None) for re-rendering."""
+        if rect is None:
+            self.dirty.update(self.tiles.keys())
+        else:
+            self.dirty.update(key for key in self.tile_keys(self.to_view(rect)) if key in self.tiles)
+
+    def draw(self, rect, paint, render=False):
+        """Run paint(painter), in document coordinates, on the tiles touching a document rect.
+
+        By default only tiles that are allocated and clean are painted;
+        the others pick the change up when they are next rendered. With
+        render=True missing and dirty tiles are rendered first.
+        """
+        for key in self.tile_keys(self.to_view(rect)):
+            if render:
+                image = self.tile(key)
+            else:
+                image = self.tiles.get(key)
+                if image is None or key in self.dirty:
+                    continue
+            painter = self.begin_paint(image, self.tile_rect(key))
+            paint(painter)
+            painter.end()
+
+    def paint(self, painter, rect):
+        """Draw the tiles covering a view-space rect, rendering any that are missing or dirty."""
+        for key in self.tile_keys(rect):
+            painter.drawImage(self.tile_rect(key).topLeft(), self.tile(key))
+
+class PixelLayer:
+    """Persistent CPU-side buffer for direct pixel edits, composited over the document.
+
+    Pixels are premultiplied BGRA (the memory layout of
+    QImage.Format_ARGB32_Premultiplied) in NumPy tiles that are only
+    allocated where something has been written. Every edit is applied
+    with one vectorised uint8 write per touched tile, a plain copy where
+    an opaque source fully covers the pixels, and returns the document
+    rect it changed, for incremental redraw.
+    """
+    def __init__(self, width, height, tile_size=256):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.tiles = {}  # (column, row) -> (tile_size, tile_size, 4) uint8
+        self.digests = {}  # (column, row) -> blob digest of the tile as last saved or loaded
+
+    @staticmethod
+    def premultiplied(color):
+        """BGRA premultiplied uint8 pixel for a QColor."""
+        alpha = color.alpha()
+        return np.array([(color.blue() * alpha + 127) // 255, (color.green() * alpha + 127) // 255,
+                         (color.red() * alpha + 127) // 255, alpha], np.uint8)
+
+    def rect(self):
+        return QRect(0, 0, self.width, self.height)
+
+    def blend(self, left, top, source, coverage=None):
+        """Composite source (an (h, w, 4) premultiplied uint8 block or one pixel) at (left, top).
+
+        coverage is an optional (h, w) array scaling the source per
+        pixel: bool, uint8 in 0..255 or float in 0..1. Tiles it leaves
+        uncovered are not allocated. Returns the dirty document rect.
+        """
+        source = np.asarray(source, np.uint8)
+        if coverage is not None:
+            coverage = np.asarray(coverage)
+            height, width = coverage.shape
+        else:
+            height, width = source.shape[:2]
+        dirty = QRect(left, top, width, height).intersected(self.rect())
+        if dirty.isEmpty():
+            return QRect()
+
+        size = self.tile_size
+        for row in range(dirty.top() // size, dirty.bottom() // size + 1):
+            for column in range(dirty.left() // size, dirty.right() // size + 1):
+                part = QRect(column * size, row * size, size, size).intersected(dirty)
+                ys = slice(part.top() - top, part.bottom() + 1 - top)
+                xs = slice(part.left() - left, part.right() + 1 - left)
+                src = source if source.ndim == 1 else source[ys, xs]
+                cov = None if coverage is None else self.coverage_bytes(coverage[ys, xs])
+                if cov is not None:
+                    if not cov.any():
+                        continue
+                    if cov.min() == 255:
+                        cov = None
+                tile = self.tiles.get((column, row))
+                if tile is None:
+                    tile = self.tiles[(column, row)] = np.zeros((size, size, 4), np.uint8)
+                dst = tile[part.top() - row * size:part.bottom() + 1 - row * size,
+                           part.left() - column * size:part.right() + 1 - column * size]
+                if cov is None and src[..., 3].min() == 255:
+                    # Opaque and fully covered: source-over is a copy, one 32-bit store per pixel for a color
+                    if src.ndim == 1:
+                        dst.view(np.uint32)[...] = src.view(np.uint32)
+                    else:
+                        dst[...] = src
+                else:
+                    # Source-over with premultiplied alpha in integers, scaled by 255 * 255:
+                    # src * c + dst * (1 - src_alpha * c) with c = cov / 255
+                    src = src.astype(np.uint32)
+                    c = 255 if cov is None else cov[..., None].astype(np.uint32)
+                    total = src * (c * 255) + dst * (65025 - src[..., 3:] * c)
+                    dst[...] = (total + 32512) // 65025
+                self.digests.pop((column, row), None)
+        return dirty
+
+    @staticmethod
+    def coverage_bytes(coverage):
+        """Coverage as uint8 in 0..255."""
+        if coverage.dtype == np.uint8:
+            return coverage
+        if coverage.dtype == bool:
+            return coverage.view(np.uint8) * np.uint8(255)
+        return (coverage * 255 + 0.5).astype(np.uint8)
+
+    def fill_rects(self, rects, color):
+        """Fill each QRect with color; returns the united dirty rect."""
+        pixel = self.premultiplied(color)
+        dirty = QRect()
+        for rect in rects:
+            rect = rect.normalized()
+            dirty = dirty.united(self.blend(rect.x(), rect.y(), np.broadcast_to(pixel, (rect.height(), rect.width(), 4))))
+        return dirty
+
+    def fill_mask(self, left, top, mask, color):
+        """Fill where mask (bool, or 0..255 uint8 or 0..1 float coverage for soft edges) is set, anchored at (left, top)."""
+        return self.blend(left, top, self.premultiplied(color), mask)
+
+    def set_points(self, xs, ys, color):
+        """Set the pixels at the given coordinate arrays to color."""
+        xs = np.asarray(xs, np.intp)
+        ys = np.asarray(ys, np.intp)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xs, ys = xs[inside], ys[inside]
+        if not len(xs):
+            return QRect()
+        left, top = int(xs.min()), int(ys.min())
+        mask = np.zeros((int(ys.max()) - top + 1, int(xs.max()) - left + 1), bool)
+        mask[ys - top, xs - left] = True
+        return self.fill_mask(left, top, mask, color)
+
+    def paint(self, painter, rect):
+        """Draw the allocated tiles touching rect, in document coordinates."""
+        size = self.tile_size
+        for (column, row), tile in self.tiles.items():
+            tile_rect = QRect(column * size, row * size, size, size)
+            if tile_rect.intersects(rect):
+                painter.drawImage(tile_rect.topLeft(), array_image(tile, QImage.Format_ARGB32_Premultiplied, borrow=True))
+
+    def clear(self):
+        self.tiles.clear()
+        self.digests.clear()
+
+class HistogramView(QWidget):
+    """Red, green and blue histograms drawn as overlaid filled curves."""
+    colors = (QColor(255, 0, 0, 110), QColor(0, 170, 0, 110), QColor(0, 0, 255, 110))
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.counts = None
+        self.setMinimumSize(280, 160)
+
+    def set_counts(self, counts):
+        self.counts = counts
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        if self.counts is None:
+            painter.drawText(self.rect(), Qt.AlignCenter, "No image selected")
+            return
+        painter.setRenderHint(QPainter.Antialiasing)
+        width, height = self.width(), self.height()
+        peak = max(int(self.counts.max()), 1)
+        xs = np.arange(257) * (width / 256)
+        for counts, color in zip(self.counts, self.colors):
+            ys = height - counts * ((height - 4) / peak)
+            path = QPainterPath(QPointF(0, height))
+            for x0, x1, y in zip(xs[:-1], xs[1:], ys):
+                path.lineTo(x0, y)
+                path.lineTo(x1, y)
+            path.lineTo(width, height)
+            painter.fillPath(path, color)
+
+class CanvasView(QWidget):
+    """Canvas display that paints the window's tiles for the exposed region only.
+
+    Inside the scroll area only the part within the viewport is ever
+    exposed, so tiles elsewhere are neither allocated nor rendered.
+    """
+    def __init__(self, canvas_window, parent=None):
+        super().__init__(parent)
+        self.canvas_window = canvas_window
+
+    def sizeHint(self):
+        return self.canvas_window.display_tiles.rect().size()
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        self.canvas_window.paint_canvas(painter, event.rect())
+        painter.end()
+
 class CanvasWindow(QMainWindow):
     def __init__(self, width, height):
         super().__init__()
         self.setWindowTitle("Fairy Painting")
-        self.setWindowIcon(QIcon(r'fairy tail.png'))
         self.setGeometry(0, 0, 2000, 1000)
 
         # Main widget without layout
@@ -154,11 +964,7 @@ class CanvasWindow(QMainWindow):
         self.canvas_background.move(20, 20)
         self.canvas_background.setStyleSheet("background-color: pink;")
 
-        # Canvas area
-        self.canvas_label = QLabel(main_widget)
-        self.canvas_label.setFixedSize(width, height)
-        self.canvas_label.move(200, 150)
-        self.create_canvas(width, height)
+        self.canvas_scale = 1.0  # Track the current scale of the canvas
 
         # List to keep track of objects on the canvas
         self.objects = []  # List of QRect for objects (images)
@@ -176,33 +982,82 @@ class CanvasWindow(QMainWindow):
         self.selected_color = QColor(Qt.black)  # Default color
         self.change_pixel_color_button.setCheckable(True)
 
-        self.canvas_scale = 1.0  # Track the current scale of the canvas
-        self.original_canvas = self.canvas.copy()  # Save the original canvas
-
         self.scroll_area = QScrollArea(self)
         self.scroll_area.setGeometry(200, 150, 1200, 800)  # Set maximum possible canvas size
         self.scroll_area.setWidgetResizable(True)
 
-        # Add the canvas QLabel inside the scroll area
-        self.canvas_label = QLabel(self.scroll_area)
-        self.canvas_label.setGeometry(0, 0, 1200, 800)  # Initial canvas size
-
-        # Set the canvas QLabel as the scroll area's widget
-        self.scroll_area.setWidget(self.canvas_label)
-
-        # Initialize the canvas
+        # The canvas view, sized by the canvas once it exists, inside the scroll area
+        self.canvas_label = CanvasView(self, self.scroll_area)
         self.create_canvas(width, height)
-
-        # Add the canvas QLabel inside the scroll area
-        self.canvas_label = QLabel(self.scroll_area)
         self.scroll_area.setWidget(self.canvas_label)
 
-        # Initialize the canvas
-        self.create_canvas(width, height)
+        # Spatial indexes over object and element bounds for picking and culling
+        self.object_index = SpatialGrid()
+        self.element_index = SpatialGrid()
+
+        # Committed elements are kept as a tiled raster, so redraws only blit it
+        self.rebuild_elements_layer()
+
+        # Coalesce redraw requests from sliders and mouse moves into one render per frame
+        self.redraw_timer = QTimer(self)
+        self.redraw_timer.setSingleShot(True)
+        self.redraw_timer.setInterval(16)  # ~60 fps
+        self.redraw_timer.timeout.connect(self.flush_redraw)
+        self.pending_dirty_rect = None
+        self.pending_full_redraw = False
+
+        # Fast transforms while a gesture is active, smooth refinement once it ends
+        self.interactive_render = False
+        self.refine_actions = {}  # name -> callable re-run at full quality
+        self.fast_rendered_rect = None
+        self.refine_timer = QTimer(self)
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.setInterval(200)
+        self.refine_timer.timeout.connect(self.end_interaction)
+
+        # Heavy image work runs on a thread pool; progress is shown in the status bar
+        self.jobs = JobQueue(parent=self)
+        self.async_min_pixels = 512 * 512  # Smaller op stacks are evaluated inline when drawn
+        self.job_progress = QProgressBar(self)
+        self.job_progress.setMaximumWidth(200)
+        self.job_cancel_button = QPushButton("Cancel", self)
+        self.job_cancel_button.clicked.connect(self.cancel_jobs)
+        self.statusBar().addPermanentWidget(self.job_progress)
+        self.statusBar().addPermanentWidget(self.job_cancel_button)
+        self.job_progress.hide()
+        self.job_cancel_button.hide()
+        self.jobs.progress.connect(self.job_progress.setValue)
+        self.jobs.active_changed.connect(self.show_job_progress)
+
+        # Canvas overview: a low-resolution copy refreshed from dirty regions at most 5x a second
+        self.mini_canvas_mip = None
+        self.mini_canvas_dirty = None
+        self.mini_canvas_timer = QTimer(self)
+        self.mini_canvas_timer.setSingleShot(True)
+        self.mini_canvas_timer.setInterval(200)
+        self.mini_canvas_timer.timeout.connect(self.update_mini_canvas)
+
+        # Histogram dock, built on first use; counts are cached per object image version
+        self.histogram_dock = None
+        self.histogram_view = None
+        self.histogram_cache = OrderedDict()
+        self.histogram_key = None
+
+        # Display, rotated and mip pixmaps of objects, keyed by image cacheKey
+        self.transform_cache = PixmapCache(max_bytes=256 * 1024 * 1024)
+
+        # Intermediate results of object op stacks; budget adjustable via set_budget
+        self.op_cache = PixmapCache(max_bytes=128 * 1024 * 1024)
+        self.transform_keys = {}  # id(obj) -> key of that object's cached pixmap
+
+        # Saved blob digests: image cacheKey -> digest, and one per full chunk of elements
+        self.blob_digests = {}
+        self.element_chunk_size = 256
+        self.element_chunk_digests = []
 
         # Upload Image Button
         self.upload_button = QPushButton(self)
-        upload_icon = QIcon("upload.png")
+        upload_icon = asset_icon("upload.png")
         self.upload_button.setIcon(upload_icon)
         self.upload_button.setGeometry(160, 50, 60, 60)
         self.upload_button.setIconSize(self.upload_button.size())
@@ -210,7 +1065,7 @@ class CanvasWindow(QMainWindow):
         
         # Drag Mode Button
         self.drag_button = QPushButton(self)
-        drag_icon = QIcon("drag.png")
+        drag_icon = asset_icon("drag.png")
         self.drag_button.setIcon(drag_icon)
         self.drag_button.setGeometry(10, 100, 60, 60)
         self.drag_button.setIconSize(self.drag_button.size())
@@ -224,7 +1079,7 @@ class CanvasWindow(QMainWindow):
 
         # Add a Crop Button
         self.crop_button = QPushButton(self)
-        crop_icon = QIcon("crop.png")
+        crop_icon = asset_icon("crop.png")
         self.crop_button.setIcon(crop_icon)
         self.crop_button.setGeometry(80, 100, 60, 60)
         self.crop_button.setIconSize(self.crop_button.size())
@@ -233,7 +1088,7 @@ class CanvasWindow(QMainWindow):
         
         # Add Flip Horizontal Button
         self.flip_horizontal_button = QPushButton(self)
-        flip_horizontal_icon = QIcon("horizontal.png")
+        flip_horizontal_icon = asset_icon("horizontal.png")
         self.flip_horizontal_button.setIcon(flip_horizontal_icon)
         self.flip_horizontal_button.setGeometry(10, 170, 60, 60)
         self.flip_horizontal_button.setIconSize(self.flip_horizontal_button.size())
@@ -241,7 +1096,7 @@ class CanvasWindow(QMainWindow):
 
         # Add Flip Vertical Button
         self.flip_vertical_button = QPushButton(self)
-        flip_vertical_icon = QIcon("vertical.png")
+        flip_vertical_icon = asset_icon("vertical.png")
         self.flip_vertical_button.setIcon(flip_vertical_icon)
         self.flip_vertical_button.setGeometry(80, 170, 60, 60)
         self.flip_vertical_button.setIconSize(self.flip_vertical_button.size())
@@ -257,6 +1112,8 @@ class CanvasWindow(QMainWindow):
         self.scale_slider.setRange(10, 300)  # Scaling from 10% to 300%
         self.scale_slider.setValue(100)  # Default scale is 100%
         self.scale_slider.valueChanged.connect(self.scale_selected_object)
+        self.scale_slider.sliderPressed.connect(self.begin_interaction)
+        self.scale_slider.sliderReleased.connect(self.end_interaction)
         self.scale_slider.setEnabled(False)  # Disable until an object is selected
 
         # Enable mouse tracking on the canvas
@@ -269,7 +1126,7 @@ class CanvasWindow(QMainWindow):
         
         # Buttons and UI for rotation
         self.rotation_button = QPushButton(self)
-        rotate_icon = QIcon("rotate.png")
+        rotate_icon = asset_icon("rotate.png")
         self.rotation_button.setIcon(rotate_icon)
         self.rotation_button.setGeometry(10, 240, 60, 60)
         self.rotation_button.setIconSize(self.rotation_button.size())
@@ -285,11 +1142,15 @@ class CanvasWindow(QMainWindow):
         self.x_translation_slider.setGeometry(10, 360, 120, 20)
         self.x_translation_slider.setMaximum(2000)
         self.x_translation_slider.valueChanged.connect(self.translate_image)
+        self.x_translation_slider.sliderPressed.connect(self.begin_interaction)
+        self.x_translation_slider.sliderReleased.connect(self.end_interaction)
 
         self.y_translation_slider = QSlider(Qt.Horizontal, self)
         self.y_translation_slider.setGeometry(10, 390, 120, 20)
         self.y_translation_slider.setMaximum(2000)
         self.y_translation_slider.valueChanged.connect(self.translate_image)
+        self.y_translation_slider.sliderPressed.connect(self.begin_interaction)
+        self.y_translation_slider.sliderReleased.connect(self.end_interaction)
 
         self.x_translation_input = QLineEdit(self)
         self.x_translation_input.setGeometry(80, 360, 50, 20)
@@ -301,57 +1162,20 @@ class CanvasWindow(QMainWindow):
         self.y_translation_input.setText("0")
         self.y_translation_input.returnPressed.connect(self.translate_image_from_input)
 
-        # Image Properties Button
-        self.properties_button = QPushButton("Show Properties", self)
-        self.properties_button.setGeometry(10, 480, 140, 40)  # Position below the slider
-        self.properties_button.clicked.connect(self.show_image_properties)
-        self.properties_button.hide()  # Initially hidden
-
-        # Color Conversion Buttons
-        self.rgb_button = QPushButton("RGB", self)
-        self.rgb_button.setGeometry(10, 530, 60, 40)  # Position below properties button
-        self.rgb_button.clicked.connect(lambda: self.convert_color("RGB"))
-        self.rgb_button.hide()
+        # Tools for the selected object, built the first time an object is selected
+        self.object_tools = None
+        self.gamma_object = None  # Object the gamma dialog edits
 
-        self.hsv_button = QPushButton("HSV", self)
-        self.hsv_button.setGeometry(80, 530, 60, 40)
-        self.hsv_button.clicked.connect(lambda: self.convert_color("HSV"))
-        self.hsv_button.hide()
-
-        self.gray_button = QPushButton("GRAY", self)
-        self.gray_button.setGeometry(10, 580, 60, 40)
-        self.gray_button.clicked.connect(lambda: self.convert_color("GRAY"))
-        self.gray_button.hide()
-
-        self.cie_button = QPushButton("CIE", self)
-        self.cie_button.setGeometry(80, 580, 60, 40)
-        self.cie_button.clicked.connect(lambda: self.convert_color("CIE"))
-        self.cie_button.hide()
-
-        self.hls_button = QPushButton("HLS", self)
-        self.hls_button.setGeometry(10, 630, 60, 40)
-        self.hls_button.clicked.connect(lambda: self.convert_color("HLS"))
-        self.hls_button.hide()
-
-        self.ycrcb_button = QPushButton("YCrCb", self)
-        self.ycrcb_button.setGeometry(80, 630, 60, 40)
-        self.ycrcb_button.clicked.connect(lambda: self.convert_color("YCrCb"))
-        self.ycrcb_button.hide()
-        
-        self.gamma_button = QPushButton("Gamma Adjustment", self)
-        self.gamma_button.setGeometry(10, 680, 140, 40)
-        self.gamma_button.setVisible(False)
-        self.gamma_button.clicked.connect(self.adjust_gamma)
-        
-        
-        
         # Initialize drawing attributes
         self.is_drawing = False
+        self.current_stroke = None  # Freehand stroke being drawn, committed on release
         self.brush_size = 5
         self.brush_color = QColor(Qt.black)
         self.current_tool = "Brush"
         self.current_shape = None  # To store the selected shape
         self.start_point = None  # Starting point for drawing shapes
+        self.shape_preview_end = None  # Current end point of the shape preview
+        self.overlay_rect = QRect()  # Document area the overlay was last painted in
 
         # Drawing toggle button
         self.draw_button = QPushButton("Enable Drawing", self)
@@ -400,7 +1224,7 @@ class CanvasWindow(QMainWindow):
 
         # Color picker button
         self.color_button = QPushButton(self)
-        color_icon = QIcon("color.png")
+        color_icon = asset_icon("color.png")
         self.color_button.setIcon(color_icon)
         self.color_button.setGeometry(410, 30, 40, 40)
         self.color_button.setIconSize(self.color_button.size())
@@ -408,7 +1232,7 @@ class CanvasWindow(QMainWindow):
         
         # Save Button button
         self.save_button = QPushButton(self)
-        save_icon = QIcon("savebutton.png")
+        save_icon = asset_icon("savebutton.png")
         self.save_button.setIcon(save_icon)
         self.save_button.setGeometry(490, 30, 40, 40)
         self.save_button.setIconSize(self.color_button.size())
@@ -478,7 +1302,7 @@ class CanvasWindow(QMainWindow):
         
         # Zoom In Button
         self.zoom_in_button = QPushButton(self)
-        zoom_in_icon = QIcon("zoom-in.png")
+        zoom_in_icon = asset_icon("zoom-in.png")
         self.zoom_in_button.setIcon(zoom_in_icon)
         self.zoom_in_button.setIconSize(self.zoom_in_button.size())
         self.zoom_in_button.setGeometry(1170, 50, 60, 60)  # Adjust position
@@ -486,7 +1310,7 @@ class CanvasWindow(QMainWindow):
 
         # Zoom Out Button
         self.zoom_out_button = QPushButton(self)
-        zoom_out_icon = QIcon("zoom-out.png")
+        zoom_out_icon = asset_icon("zoom-out.png")
         self.zoom_out_button.setIcon(zoom_out_icon)
         self.zoom_out_button.setIconSize(self.zoom_out_button.size())
         self.zoom_out_button.setGeometry(1240, 50, 60, 60)  # Adjust position
@@ -494,7 +1318,7 @@ class CanvasWindow(QMainWindow):
 
         # Reset Canvas Button
         self.reset_canvas_button = QPushButton(self)
-        reset_icon = QIcon("reset.png")
+        reset_icon = asset_icon("reset.png")
         self.reset_canvas_button.setIcon(reset_icon)
         self.reset_canvas_button.setIconSize(self.reset_canvas_button.size())
         self.reset_canvas_button.setGeometry(1310, 50, 60, 60)  # Adjust position
@@ -502,14 +1326,14 @@ class CanvasWindow(QMainWindow):
         
         # Buttons for selected object actions
         self.edit_button = QPushButton(self)
-        edit_icon = QIcon("fill.png")
+        edit_icon = asset_icon("fill.png")
         self.edit_button.setIcon(edit_icon)
         self.edit_button.setIconSize(self.edit_button.size())
         self.edit_button.setGeometry(1380, 50, 60, 60)
         self.edit_button.clicked.connect(self.edit_selected_object)
         
         self.delete_button = QPushButton(self)
-        delete_icon = QIcon("bin.png")
+        delete_icon = asset_icon("bin.png")
         self.delete_button.setIcon(delete_icon)
         self.delete_button.setIconSize(self.delete_button.size())
         self.delete_button.setGeometry(1450, 50, 60, 60)
@@ -520,32 +1344,274 @@ class CanvasWindow(QMainWindow):
         self.show_original_button.setGeometry(1520, 60, 140, 40)  # Adjust position as needed
         self.show_original_button.clicked.connect(self.show_original_image)
 
-        # Add a button for displaying the histogram
-        self.histogram_button = QPushButton("Show Histogram", self)
-        self.histogram_button.setGeometry(10, 730, 140, 40)  # Adjust position as needed
-        self.histogram_button.clicked.connect(self.show_histogram)
-        self.histogram_button.setVisible(False)  # Initially hidden
-        
-        # Add the bitwise dropdown button
-        self.bitwise_dropdown = QComboBox(self)
-        self.bitwise_dropdown.setGeometry(10, 780, 140, 40)  # Adjust position below the histogram button
-        self.bitwise_dropdown.addItems(["Select Operation", "Bitwise AND", "Bitwise OR", "Bitwise XOR"])
-        self.bitwise_dropdown.currentTextChanged.connect(self.perform_bitwise_operation)
-        self.bitwise_dropdown.setVisible(False)  # Initially hidden
-        
-        # Add Negative Image Button
-        self.negative_image_button = QPushButton("Negative Image", self)
-        self.negative_image_button.setGeometry(10, 830, 140, 40)  # Adjust position as needed
-        self.negative_image_button.clicked.connect(self.negative_image)
-        self.negative_image_button.setVisible(False)  # Initially hidden
+        # Options for the Change Pixel Color flood fill
+        self.fill_tolerance_label = QLabel("Fill Tolerance", self)
+        self.fill_tolerance_label.setGeometry(10, 880, 140, 20)
+        self.fill_tolerance_spinbox = QSpinBox(self)
+        self.fill_tolerance_spinbox.setGeometry(10, 900, 60, 25)
+        self.fill_tolerance_spinbox.setRange(0, 255)
+        self.fill_tolerance_spinbox.setValue(0)  # Exact color match by default
+
+        self.fill_connectivity_dropdown = QComboBox(self)
+        self.fill_connectivity_dropdown.setGeometry(80, 900, 70, 25)
+        self.fill_connectivity_dropdown.addItems(["4-way", "8-way"])
 
+        self.fill_smooth_checkbox = QCheckBox("Smooth Edge", self)
+        self.fill_smooth_checkbox.setGeometry(10, 930, 140, 20)
 
     def create_canvas(self, width, height):
-        # Create a blank white canvas using QPixmap
-        self.canvas = QPixmap(width, height)
-        self.canvas.fill(Qt.white)
-        self.canvas_label.setPixmap(self.canvas)
+        # Create a blank white canvas, stored as lazily rendered tiles
+        self.canvas_width = width
+        self.canvas_height = height
+        self.pixel_layer = PixelLayer(width, height)
+        self.create_view_tiles()
+
+    def create_view_tiles(self):
+        # Fresh tile stores at the current zoom; tiles render lazily as they come into view
+        self.element_tiles = TileStore(self.canvas_width, self.canvas_height, self.render_element_tile, self.canvas_scale)
+        self.display_tiles = TileStore(self.canvas_width, self.canvas_height, self.render_display_tile, self.canvas_scale)
+        self.canvas_label.updateGeometry()
+        self.canvas_label.update()
+
+    def document_event(self, event):
+        """Map a mouse event on the canvas widget into document coordinates."""
+        if self.canvas_scale == 1.0:
+            return event
+        pos = QPointF(event.pos()) / self.canvas_scale
+        return QMouseEvent(event.type(), pos, event.button(), event.buttons(), event.modifiers())
+
+    def document_rect(self):
+        return QRect(0, 0, self.canvas_width, self.canvas_height)
+
+    def render_element_tile(self, image, rect):
+        # Fill a tile of the committed-element raster from the elements indexed there
+        image.fill(Qt.white)
+        painter = self.element_tiles.begin_paint(image, rect)
+        painter.setRenderHint(QPainter.Antialiasing, self.canvas_scale != 1.0)
+        rect = self.element_tiles.to_document(rect)
+        for element in self.element_index.query(rect):
+            self.paint_element(painter, element)
+        if self.current_stroke:
+            points = np.array(self.current_stroke['points'], dtype=np.float32).reshape(-1, 2)
+            painter.setPen(self.current_stroke['pen'])
+            painter.drawPath(self.build_stroke_path(points))
+        painter.end()
+
+    def render_display_tile(self, image, rect):
+        # Composite one display tile: committed elements, then objects
+        painter = QPainter(image)
+        painter.translate(-rect.x(), -rect.y())
+        self.element_tiles.paint(painter, rect)
+
+        # Objects and outlines are drawn in document coordinates
+        painter.scale(self.canvas_scale, self.canvas_scale)
+        rect = self.display_tiles.to_document(rect)
+        if self.interactive_render:
+            # Remember what was drawn at preview quality so it can be refined
+            self.fast_rendered_rect = rect if self.fast_rendered_rect is None else self.fast_rendered_rect.united(rect)
+        elif self.canvas_scale != 1.0:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        self.paint_objects(painter, rect)
+        self.pixel_layer.paint(painter, rect)
+        painter.end()
+
+    def paint_objects(self, painter, rect):
+        # Draw the objects the index says touch rect, in stacking order
+        scale = painter.worldTransform().m11()
+        for obj in self.object_index.query(rect):
+            if 'loader' in obj:
+                # Still loading in the background
+                painter.fillRect(obj['rect'], QColor(220, 220, 220))
+                continue
+            if 'proxy' in obj:
+                # Reduced-resolution live preview, stretched over the object's area
+                painter.drawPixmap(self.object_bounds(obj), obj['proxy'])
+                continue
+            pixmap = self.rotated_pixmap(obj)
+            if scale >= 1.0:
+                painter.drawPixmap(obj['x'], obj['y'], pixmap)
+            else:
+                # Zoomed out: draw from the mip level closest to the on-screen size
+                target = QRect(obj['x'], obj['y'], pixmap.width(), pixmap.height())
+                painter.drawPixmap(target, self.object_mip(pixmap, scale))
+
+    def object_mip(self, pixmap, scale):
+        """Return the power-of-two reduction of pixmap that best matches scale (cached)."""
+        level = 1
+        while scale * level * 2 <= 1.0 and min(pixmap.width(), pixmap.height()) // (level * 2) > 0:
+            level *= 2
+        if level == 1:
+            return pixmap
+        key = (pixmap.cacheKey(), 'mip', level)
+        mip = self.transform_cache.get(key)
+        if mip is None:
+            # Each level is halved from the one above, which is cached in turn
+            parent = self.object_mip(pixmap, 2.0 / level)
+            mip = parent.scaled(max(1, parent.width() // 2), max(1, parent.height() // 2),
+                                Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            self.transform_cache.put(key, mip)
+        return mip
+
+    def paint_document(self, painter, rect):
+        """Paint the document content in rect straight from its sources, bypassing the tiles."""
+        painter.fillRect(rect, Qt.white)
+        for element in self.element_index.query(rect):
+            self.paint_element(painter, element)
+        self.paint_objects(painter, rect)
+        self.pixel_layer.paint(painter, rect)
+
+    def render_document(self, rect=None, image_format=QImage.Format_ARGB32_Premultiplied):
+        """Render the document (or part of it) into a new image, e.g. for export."""
+        if rect is None:
+            rect = self.document_rect()
+        image = QImage(rect.size(), image_format)
+        painter = QPainter(image)
+        painter.translate(-rect.x(), -rect.y())
+        self.paint_document(painter, rect)
+        painter.end()
+        return image
+
+    def paint_canvas(self, painter, rect):
+        """Paint the exposed part of the canvas widget; only visible tiles get rendered."""
+        self.display_tiles.paint(painter, rect)
+        painter.scale(self.canvas_scale, self.canvas_scale)
+        self.paint_overlay(painter)
+
+    def preview_font(self):
+        # Font the pending text is typed in
+        font = QFont(self.font_style_dropdown.currentText(), self.font_size_spinbox.value())
+        font.setBold(self.text_bold)
+        font.setItalic(self.text_italic)
+        font.setUnderline(self.text_underline)
+        return font
+
+    def text_box_rect(self):
+        return QRect(self.text_start_point, QPoint(self.text_start_point.x() + 200, self.text_start_point.y()-20))
+
+    def overlay_bounds(self):
+        """Document area covered by the overlay primitives that are currently shown."""
+        bounds = QRect()
+        if self.is_shape_mode and self.start_point and self.shape_preview_end:
+            end_point = self.shape_preview_end
+            if self.current_shape == "Circle":
+                radius = int(((end_point.x() - self.start_point.x())**2 + (end_point.y() - self.start_point.y())**2)**0.5)
+                shape_rect = QRect(self.start_point.x() - radius, self.start_point.y() - radius, 2 * radius, 2 * radius)
+            else:
+                shape_rect = QRect(self.start_point, end_point).normalized()
+            margin = self.brush_size // 2 + 2
+            bounds = bounds.united(shape_rect.adjusted(-margin, -margin, margin, margin))
+        if self.is_text_mode and self.text_start_point:
+            metrics = QFontMetrics(self.preview_font())
+            text_rect = metrics.boundingRect(self.current_text + "|").translated(self.text_start_point)
+            bounds = bounds.united(self.text_box_rect().normalized()).united(text_rect)
+        if self.crop_mode_active and self.crop_rect:
+            bounds = bounds.united(self.crop_rect.normalized())
+        if self.selected_object:
+            bounds = bounds.united(self.selected_object['rect'])
+        return bounds.adjusted(-2, -2, 2, 2) if not bounds.isNull() else bounds
+
+    def update_overlay(self):
+        """Repaint just the area the overlay covered before and covers now."""
+        bounds = self.overlay_bounds()
+        dirty_rect = self.overlay_rect.united(bounds)
+        self.overlay_rect = bounds
+        if not dirty_rect.isEmpty():
+            self.canvas_label.update(self.display_tiles.to_view(dirty_rect))
+
+    def paint_overlay(self, painter):
+        # Previews and outlines are painted over the tiles, never into them
+        if self.is_shape_mode and self.start_point and self.shape_preview_end:
+            pen = QPen(self.brush_color, self.brush_size, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+            painter.setPen(pen)
+
+            end_point = self.shape_preview_end
+
+            # Draw the selected shape
+            if self.current_shape == "Circle":
+                radius = int(((end_point.x() - self.start_point.x())**2 + (end_point.y() - self.start_point.y())**2)**0.5)
+                painter.drawEllipse(self.start_point, radius, radius)
+            elif self.current_shape == "Rectangle":
+                painter.drawRect(QRect(self.start_point, end_point))
+            elif self.current_shape == "Square":
+                side = min(abs(end_point.x() - self.start_point.x()), abs(end_point.y() - self.start_point.y()))
+                painter.drawRect(self.start_point.x(), self.start_point.y(), side, side)
+            elif self.current_shape == "Line":
+                painter.drawLine(self.start_point, end_point)
+            elif self.current_shape == "Triangle":
+                points = [
+                    self.start_point,
+                    QPoint(self.start_point.x(), end_point.y()),
+                    QPoint(end_point.x(), end_point.y())
+                ]
+                painter.drawPolygon(*points)
+
+        if self.is_text_mode and self.text_start_point:
+            # Draw the text box as a rectangle
+            pen = QPen(Qt.gray, 1, Qt.DashLine)
+            painter.setPen(pen)
+            painter.drawRect(self.text_box_rect())
+
+            # Draw the preview text followed by the caret
+            font = self.preview_font()
+            painter.setFont(font)
+            painter.drawText(self.text_start_point, self.current_text)
+            metrics = QFontMetrics(font)
+            caret_x = self.text_start_point.x() + metrics.horizontalAdvance(self.current_text)
+            painter.setPen(QPen(Qt.black, 1))
+            painter.drawLine(caret_x, self.text_start_point.y() - metrics.ascent(),
+                             caret_x, self.text_start_point.y() + metrics.descent())
+
+        # Draw the crop rectangle, if defined
+        if self.crop_mode_active and self.crop_rect:
+            painter.setPen(Qt.red)
+            painter.drawRect(self.crop_rect)
+
+        if self.selected_object:
+            painter.setPen(QPen(Qt.red, 2, Qt.SolidLine))
+            painter.drawRect(self.selected_object['rect'])
         
+    def paint_element(self, painter, element):
+        # Render a single persistent element with the given painter
+        if element['type'] == 'drawing':
+            painter.setPen(element['pen'])
+            painter.drawPath(element['path'])
+        elif element['type'] == 'shape':
+            painter.setPen(element['pen'])
+            painter.drawPath(element['path'])
+        elif element['type'] == 'text':
+            painter.setFont(element['font'])
+            painter.setPen(element['pen'])
+            painter.drawText(element['position'], element['text'])
+
+    def element_bounds(self, element):
+        """Canvas area an element paints into."""
+        if element['type'] == 'text':
+            rect = QFontMetrics(element['font']).boundingRect(element['text'])
+            return rect.translated(QPointF(element['position']).toPoint()).adjusted(-2, -2, 2, 2)
+        margin = element['pen'].width() // 2 + 2
+        return element['path'].boundingRect().toAlignedRect().adjusted(-margin, -margin, margin, margin)
+
+    def rebuild_elements_layer(self, dirty_rect=None):
+        """Invalidate the committed-element tiles (only those touching dirty_rect if given).
+
+        Only needed when elements are removed or transformed; adding an
+        element goes through commit_element instead. A full rebuild also
+        re-indexes every element. Tiles re-render lazily from the index.
+        """
+        if dirty_rect is None:
+            self.element_index.clear()
+            for element in self.elements:
+                self.element_index.insert(element, self.element_bounds(element))
+        self.element_tiles.mark_dirty(dirty_rect)
+
+    def commit_element(self, element):
+        """Store a new element and extend the committed-element tiles with it."""
+        self.elements.append(element)
+        bounds = self.element_bounds(element)
+        self.element_index.insert(element, bounds)
+        self.element_tiles.draw(bounds, lambda painter: self.paint_element(painter, element))
+        self.schedule_redraw(bounds)
+
     def setup_menu(self):
         menubar = self.menuBar()
         file_menu = menubar.addMenu("File")
@@ -605,69 +1671,214 @@ class CanvasWindow(QMainWindow):
             self, "Save Canvas File", "", "Canvas Files (*.canvas);;All Files (*)", options=options
         )
         if file_path:
+            self.flush_redraw()
             try:
-                # Convert QPixmap objects to image byte arrays
-                objects_data = []
-                for obj in self.objects:
-                    pixmap_bytes = QByteArray()
-                    buffer = QBuffer(pixmap_bytes)
-                    buffer.open(QIODevice.WriteOnly)
-                    obj['pixmap'].save(buffer, "PNG")  # Save QPixmap as PNG
-                    objects_data.append({
-                        'pixmap': pixmap_bytes.data(),
-                        'x': obj['x'],
-                        'y': obj['y'],
-                        'rect': (obj['rect'].x(), obj['rect'].y(), obj['rect'].width(), obj['rect'].height())
-                    })
-
-                # Serialize other data
-                elements_data = []
-                for element in self.elements:
-                    if element['type'] == 'drawing':
-                        pen_data = {
-                            'color': element['pen'].color().getRgb(),
-                            'width': element['pen'].width(),
-                        }
-                        path_data = [(point.x(), point.y()) for point in element['path'].toFillPolygon()]
-                        elements_data.append({'type': 'drawing', 'pen': pen_data, 'path': path_data})
-                    elif element['type'] == 'shape':
-                        pen_data = {
-                            'color': element['pen'].color().getRgb(),
-                            'width': element['pen'].width(),
-                        }
-                        path_data = [(point.x(), point.y()) for point in element['path'].toFillPolygon()]
-                        elements_data.append({'type': 'shape', 'pen': pen_data, 'path': path_data})
-                    elif element['type'] == 'text':
-                        font_data = {
-                            'family': element['font'].family(),
-                            'size': element['font'].pointSize(),
-                            'bold': element['font'].bold(),
-                            'italic': element['font'].italic(),
-                            'underline': element['font'].underline(),
-                        }
-                        pen_data = {'color': element['pen'].color().getRgb()}
-                        elements_data.append({
-                            'type': 'text',
-                            'font': font_data,
-                            'pen': pen_data,
-                            'position': (element['position'].x(), element['position'].y()),
-                            'text': element['text'],
-                        })
-
-                data = {
-                    'elements': elements_data,
-                    'objects': objects_data,
-                    'canvas_width': self.canvas.width(),
-                    'canvas_height': self.canvas.height(),
-                }
-
-                # Save to file
-                with open(file_path, 'wb') as file:
-                    pickle.dump(data, file)
+                self.save_project(file_path)
                 print(f"Canvas saved to {file_path}")
             except Exception as e:
                 print(f"Failed to save file: {e}")
 
+    def save_project(self, file_path):
+        """Save to a ProjectStore, writing only blobs the project does not have yet."""
+        store = ProjectStore(file_path)
+
+        # Object pixels are stored raw; digests are remembered per image version so unchanged ones are not rehashed
+        objects_data = []
+        for obj in self.objects:
+            image = self.object_image(obj)
+            digest = self.blob_digests.get(image.cacheKey())
+            if digest is None or not store.has_blob(digest):
+                digest = store.put_blob(image_bytes(image), digest)
+                self.blob_digests[image.cacheKey()] = digest
+            objects_data.append({
+                'blob': digest,
+                'width': image.width(),
+                'height': image.height(),
+                'x': obj['x'],
+                'y': obj['y'],
+                'rect': (obj['rect'].x(), obj['rect'].y(), obj['rect'].width(), obj['rect'].height())
+            })
+
+        # Elements are append-only, so full chunks keep their digest from one save to the next
+        element_chunks = []
+        for index, start in enumerate(range(0, len(self.elements), self.element_chunk_size)):
+            chunk = self.elements[start:start + self.element_chunk_size]
+            digest = self.element_chunk_digests[index] if index < len(self.element_chunk_digests) else None
+            if digest is None or not store.has_blob(digest):
+                digest = store.put_blob(self.encode_elements(chunk))
+                if len(chunk) == self.element_chunk_size:
+                    self.element_chunk_digests[index:index + 1] = [digest]
+            element_chunks.append(digest)
+
+        # Pixel edits are stored per allocated tile, so a save rewrites only the tiles edited since the last one
+        layer = self.pixel_layer
+        pixel_tiles = []
+        for (column, row), tile in layer.tiles.items():
+            digest = layer.digests.get((column, row))
+            if digest is None or not store.has_blob(digest):
+                digest = layer.digests[(column, row)] = store.put_blob(tile.tobytes(), digest)
+            pixel_tiles.append([column, row, digest])
+
+        store.write_manifest({
+            'version': 3,
+            'canvas_width': self.canvas_width,
+            'canvas_height': self.canvas_height,
+            'elements': element_chunks,
+            'objects': objects_data,
+            'pixel_tile_size': layer.tile_size,
+            'pixel_tiles': pixel_tiles,
+        })
+        store.collect_garbage(set(element_chunks) | {obj['blob'] for obj in objects_data} | {tile[2] for tile in pixel_tiles})
+
+    def element_data(self, element):
+        """Plain-data form of an element, as stored in project files; geometry is stored separately."""
+        if element['type'] == 'drawing':
+            pen_data = {
+                'color': element['pen'].color().getRgb(),
+                'width': element['pen'].width(),
+            }
+            return {'type': 'drawing', 'pen': pen_data}
+        elif element['type'] == 'shape':
+            pen_data = {
+                'color': element['pen'].color().getRgb(),
+                'width': element['pen'].width(),
+            }
+            return {'type': 'shape', 'pen': pen_data}
+        elif element['type'] == 'text':
+            font_data = {
+                'family': element['font'].family(),
+                'size': element['font'].pointSize(),
+                'bold': element['font'].bold(),
+                'italic': element['font'].italic(),
+                'underline': element['font'].underline(),
+            }
+            pen_data = {'color': element['pen'].color().getRgb()}
+            return {
+                'type': 'text',
+                'font': font_data,
+                'pen': pen_data,
+                'position': (element['position'].x(), element['position'].y()),
+                'text': element['text'],
+            }
+
+    def encode_elements(self, elements):
+        """Pack elements into one chunk blob.
+
+        The blob is ELEMENT_CHUNK_MAGIC, a little-endian uint32 header
+        length and a JSON header of element_data() entries, followed by
+        three packed buffers: stroke points as float32 (x, y), then shape
+        points as float64 (x, y) with their uint8 QPainterPath element
+        types. Both keep the precision the points have in memory, so
+        files round-trip exactly. Header entries with geometry hold
+        [first point, point count] into the buffer for their type.
+        """
+        header = []
+        strokes, shapes, codes = [], [], []
+        stroke_count = shape_count = 0
+        for element in elements:
+            data = self.element_data(element)
+            if element['type'] == 'drawing':
+                data['geometry'] = [stroke_count, len(element['points'])]
+                stroke_count += len(element['points'])
+                strokes.append(element['points'])
+            elif element['type'] == 'shape':
+                points, types = path_geometry(element['path'])
+                data['geometry'] = [shape_count, len(points)]
+                shape_count += len(points)
+                shapes.append(points)
+                codes.append(types)
+            header.append(data)
+
+        header = json.dumps(header).encode('utf-8')
+        return b''.join((
+            ELEMENT_CHUNK_MAGIC, struct.pack('<I', len(header)), header,
+            np.concatenate(strokes or [np.empty((0, 2))]).astype('<f4').tobytes(),
+            np.concatenate(shapes or [np.empty((0, 2))]).astype('<f8').tobytes(),
+            np.concatenate(codes or [np.empty(0)]).astype(np.uint8).tobytes(),
+        ))
+
+    def decode_elements(self, data):
+        """Unpack an encode_elements() blob into elements."""
+        if not data.startswith(ELEMENT_CHUNK_MAGIC):
+            # Chunks saved before geometry was packed
+            return [self.element_from_data(element_data) for element_data in json.loads(data.decode('utf-8'))]
+        start = len(ELEMENT_CHUNK_MAGIC)
+        header_size, = struct.unpack_from('<I', data, start)
+        start += 4
+        header = json.loads(data[start:start + header_size].decode('utf-8'))
+        stroke_count = sum(entry['geometry'][1] for entry in header if entry['type'] == 'drawing')
+        shape_count = sum(entry['geometry'][1] for entry in header if entry['type'] == 'shape')
+
+        # Zero-copy views of the three buffers
+        offset = start + header_size
+        strokes = np.frombuffer(data, '<f4', stroke_count * 2, offset).reshape(-1, 2)
+        offset += stroke_count * 8
+        shapes = np.frombuffer(data, '<f8', shape_count * 2, offset).reshape(-1, 2)
+        offset += shape_count * 16
+        codes = np.frombuffer(data, np.uint8, shape_count, offset)
+
+        elements = []
+        for element_data in header:
+            if 'geometry' in element_data:
+                first, length = element_data['geometry']
+                if element_data['type'] == 'drawing':
+                    element_data['points'] = strokes[first:first + length]
+                else:
+                    element_data['points'] = shapes[first:first + length]
+                    element_data['codes'] = codes[first:first + length]
+            elements.append(self.element_from_data(element_data))
+        return elements
+
+    def element_from_data(self, element_data):
+        """Rebuild an element from element_data() output plus its points and codes (or an older 'path' list)."""
+        if element_data['type'] == 'drawing':
+            pen = QPen()
+            color = QColor()
+            color.setRgb(*element_data['pen']['color'])
+            pen.setColor(color)
+            pen.setWidth(element_data['pen']['width'])
+            pen.setCapStyle(Qt.RoundCap)
+            pen.setJoinStyle(Qt.RoundJoin)
+
+            points = element_data.get('points')
+            if points is None:
+                points = np.array(element_data['path'], dtype=np.float32).reshape(-1, 2)
+            return {'type': 'drawing', 'pen': pen, 'points': points, 'path': self.build_stroke_path(points)}
+        elif element_data['type'] == 'shape':
+            pen = QPen()
+            color = QColor()
+            color.setRgb(*element_data['pen']['color'])
+            pen.setColor(color)
+            pen.setWidth(element_data['pen']['width'])
+
+            if 'points' in element_data:
+                path = geometry_path(element_data['points'], element_data['codes'])
+            else:
+                # Older files hold the outline as a point list
+                path = polyline_path(np.array(element_data['path'], dtype=np.float64).reshape(-1, 2))
+
+            return {'type': 'shape', 'pen': pen, 'path': path}
+        elif element_data['type'] == 'text':
+            font = QFont()
+            font.setFamily(element_data['font']['family'])
+            font.setPointSize(element_data['font']['size'])
+            font.setBold(element_data['font']['bold'])
+            font.setItalic(element_data['font']['italic'])
+            font.setUnderline(element_data['font']['underline'])
+
+            pen = QPen()
+            color = QColor()
+            color.setRgb(*element_data['pen']['color'])
+            pen.setColor(color)
+
+            return {
+                'type': 'text',
+                'font': font,
+                'pen': pen,
+                'position': QPointF(element_data['position'][0], element_data['position'][1]),
+                'text': element_data['text'],
+            }
+
     def load_file(self):
         options = QFileDialog.Options()
         file_path, _ = QFileDialog.getOpenFileName(
@@ -675,84 +1886,117 @@ class CanvasWindow(QMainWindow):
         )
         if file_path:
             try:
-                with open(file_path, 'rb') as file:
-                    data = pickle.load(file)
-
-                    # Recreate elements from saved data
-                    self.elements = []
-                    for element_data in data.get('elements', []):
-                        if element_data['type'] == 'drawing':
-                            pen = QPen()
-                            color = QColor()
-                            color.setRgb(*element_data['pen']['color'])
-                            pen.setColor(color)
-                            pen.setWidth(element_data['pen']['width'])
-
-                            path = QPainterPath()
-                            for point in element_data['path']:
-                                path.lineTo(QPointF(point[0], point[1]))
-
-                            self.elements.append({'type': 'drawing', 'pen': pen, 'path': path})
-                        elif element_data['type'] == 'shape':
-                            pen = QPen()
-                            color = QColor()
-                            color.setRgb(*element_data['pen']['color'])
-                            pen.setColor(color)
-                            pen.setWidth(element_data['pen']['width'])
-
-                            path = QPainterPath()
-                            for point in element_data['path']:
-                                path.lineTo(QPointF(point[0], point[1]))
-
-                            self.elements.append({'type': 'shape', 'pen': pen, 'path': path})
-                        elif element_data['type'] == 'text':
-                            font = QFont()
-                            font.setFamily(element_data['font']['family'])
-                            font.setPointSize(element_data['font']['size'])
-                            font.setBold(element_data['font']['bold'])
-                            font.setItalic(element_data['font']['italic'])
-                            font.setUnderline(element_data['font']['underline'])
-
-                            pen = QPen()
-                            color = QColor()
-                            color.setRgb(*element_data['pen']['color'])
-                            pen.setColor(color)
-
-                            self.elements.append({
-                                'type': 'text',
-                                'font': font,
-                                'pen': pen,
-                                'position': QPointF(element_data['position'][0], element_data['position'][1]),
-                                'text': element_data['text'],
-                            })
-
-                    # Recreate objects from saved data
-                    self.objects = []
-                    for obj_data in data.get('objects', []):
-                        pixmap_bytes = obj_data['pixmap']
-                        pixmap = QPixmap()
-                        buffer = QBuffer()
-                        buffer.setData(pixmap_bytes)
-                        buffer.open(QIODevice.ReadOnly)
-                        pixmap.loadFromData(buffer.data(), "PNG")
-                        rect_data = obj_data['rect']
-                        self.objects.append({
-                            'pixmap': pixmap,
-                            'x': obj_data['x'],
-                            'y': obj_data['y'],
-                            'rect': QRect(rect_data[0], rect_data[1], rect_data[2], rect_data[3]),
-                        })
-
-                    # Reinitialize canvas
-                    canvas_width = data.get('canvas_width', 800)
-                    canvas_height = data.get('canvas_height', 600)
-                    self.create_canvas(canvas_width, canvas_height)
-                    self.redraw_canvas()
-
+                if ProjectStore.is_project(file_path):
+                    self.load_project(file_path)
+                else:
+                    self.load_pickled_project(file_path)
                 print(f"Canvas loaded from {file_path}")
             except Exception as e:
                 print(f"Failed to load file: {e}")
-                
+
+    def load_project(self, file_path):
+        store = ProjectStore(file_path)
+        manifest = store.read_manifest()
+
+        # Recreate elements chunk by chunk; full chunks keep their digest for the next save
+        elements = []
+        for digest in manifest.get('elements', []):
+            elements.extend(self.decode_elements(store.read_blob(digest)))
+        chunk_digests = manifest.get('elements', [])[:len(elements) // self.element_chunk_size]
+
+        # Objects start as placeholders over memory-mapped pixel blobs
+        objects = []
+        for obj_data in manifest.get('objects', []):
+            loader = partial(store.map_image, obj_data['blob'], obj_data['width'], obj_data['height'])
+            obj = self.placeholder_object(obj_data, loader)
+            obj['blob'] = obj_data['blob']
+            objects.append(obj)
+
+        # Pixel tiles are copied out of their blobs so later edits can write to them
+        pixel_layer = PixelLayer(manifest.get('canvas_width', 800), manifest.get('canvas_height', 600),
+                                 manifest.get('pixel_tile_size', 256))
+        size = pixel_layer.tile_size
+        for column, row, digest in manifest.get('pixel_tiles', []):
+            tile = np.frombuffer(store.read_blob(digest), np.uint8).reshape(size, size, 4).copy()
+            pixel_layer.tiles[(column, row)] = tile
+            pixel_layer.digests[(column, row)] = digest
+
+        self.show_loaded_project(manifest, elements, objects, pixel_layer)
+        self.element_chunk_digests = chunk_digests
+
+    def load_pickled_project(self, file_path):
+        # Projects saved before the manifest format
+        with open(file_path, 'rb') as file:
+            data = pickle.load(file)
+
+        elements = [self.element_from_data(element_data) for element_data in data.get('elements', [])]
+        objects = [self.placeholder_object(obj_data, partial(QImage.fromData, obj_data['pixmap'], "PNG"))
+                   for obj_data in data.get('objects', [])]
+        self.show_loaded_project(data, elements, objects)
+
+    def placeholder_object(self, obj_data, loader):
+        """Object whose pixels come from loader() in the background; drawn as a placeholder until then."""
+        rect_data = obj_data['rect']
+        return {
+            'image': None,
+            'original_image': None,
+            'ops': [],
+            'x': obj_data['x'],
+            'y': obj_data['y'],
+            'rect': QRect(rect_data[0], rect_data[1], rect_data[2], rect_data[3]),
+            'loader': loader
+        }
+
+    def load_objects_async(self):
+        """Load placeholder objects on the worker pool, nearest the visible area first."""
+        scroll = QPoint(self.scroll_area.horizontalScrollBar().value(), self.scroll_area.verticalScrollBar().value())
+        center = self.display_tiles.to_document(QRect(scroll, self.scroll_area.viewport().size())).center()
+        pending = [obj for obj in self.objects if 'loader' in obj]
+        pending.sort(key=lambda obj: (obj['rect'].center() - center).manhattanLength())
+        for obj in pending:
+            # The pool runs jobs in submission order
+            self.jobs.submit(('load', id(obj)), load_object_image, obj['loader'],
+                             on_done=lambda image, obj=obj: self.has_object(obj) and self.object_loaded(obj, image))
+
+    def object_loaded(self, obj, image):
+        """Swap a placeholder's loader for its pixels."""
+        if 'loader' not in obj:
+            return
+        del obj['loader']
+        self.jobs.cancel(('load', id(obj)))
+        obj['original_image'] = obj['image'] = premultiplied(image)
+        digest = obj.pop('blob', None)
+        if digest is not None:
+            self.blob_digests[image.cacheKey()] = digest
+        self.object_changed(obj)
+
+    def show_loaded_project(self, data, elements, objects, pixel_layer=None):
+        # Stop loading whatever project was open before
+        for name in list(self.jobs.jobs):
+            if name[0] == 'load':
+                self.jobs.cancel(name)
+        self.elements = elements
+        self.element_chunk_digests = []
+        self.objects = objects
+
+        # Nothing from the previous project stays selected, cropped or under the gamma dialog
+        self.select_object(None)
+        self.scale_slider.setEnabled(False)
+        self.set_object_tools_visible(False)
+        self.crop_start_pos = None
+        self.crop_rect = None
+
+        # Reinitialize canvas
+        canvas_width = data.get('canvas_width', 800)
+        canvas_height = data.get('canvas_height', 600)
+        self.create_canvas(canvas_width, canvas_height)
+        if pixel_layer is not None:
+            self.pixel_layer = pixel_layer
+        self.rebuild_elements_layer()
+        self.rebuild_object_index()
+        self.redraw_canvas()
+        self.load_objects_async()
+
     def add_thumbnail(self, pixmap, label="Image"):
         # Add a thumbnail for the uploaded or merged image
         thumbnail_item = QListWidgetItem(label)
@@ -764,8 +2008,8 @@ class CanvasWindow(QMainWindow):
     # Select the corresponding image when a thumbnail is clicked
         index = self.thumbnail_panel.row(item)
         if index < len(self.objects):
-            self.selected_object = self.objects[index]
-            self.redraw_canvas()  # Highlight or update the canvas to show the selected image
+            self.select_object(self.objects[index])
+            self.update_overlay()  # Outline the selected image
 
     def toggle_mini_canvas(self):
         if hasattr(self, "mini_canvas_dialog") and self.mini_canvas_dialog.isVisible():
@@ -799,13 +2043,62 @@ class CanvasWindow(QMainWindow):
         if hasattr(self, "mini_canvas_label"):
             self.update_mini_canvas()
       
+    def mark_mini_canvas_dirty(self, dirty_rect=None):
+        """Queue part of the canvas (all of it if dirty_rect is None) for the overview."""
+        if dirty_rect is None:
+            dirty_rect = self.document_rect()
+        if self.mini_canvas_dirty is None:
+            self.mini_canvas_dirty = QRect(dirty_rect)
+        else:
+            self.mini_canvas_dirty = self.mini_canvas_dirty.united(dirty_rect)
+
+        # Throttle: while an update is pending, further damage just joins it
+        if hasattr(self, "mini_canvas_dialog") and self.mini_canvas_dialog.isVisible():
+            if not self.mini_canvas_timer.isActive():
+                self.mini_canvas_timer.start()
+
+    def update_mini_canvas_mip(self):
+        """Downsample the dirty part of the canvas into the overview mip level."""
+        # Largest power-of-two reduction that still leaves ~512 px on the long side
+        level = 1
+        while max(self.canvas_width, self.canvas_height) // (level * 2) >= 512:
+            level *= 2
+        mip_size = QSize(-(-self.canvas_width // level), -(-self.canvas_height // level))
+        if self.mini_canvas_mip is None or self.mini_canvas_mip.size() != mip_size:
+            self.mini_canvas_mip = QPixmap(mip_size)
+            self.mini_canvas_dirty = self.document_rect()
+        if self.mini_canvas_dirty is None:
+            return
+
+        # Align the region to the mip grid so each block maps to whole mip pixels
+        dirty = self.mini_canvas_dirty
+        self.mini_canvas_dirty = None
+        left, top = dirty.left() // level * level, dirty.top() // level * level
+        right = -(-(dirty.right() + 1) // level) * level
+        bottom = -(-(dirty.bottom() + 1) // level) * level
+        source = QRect(left, top, right - left, bottom - top).intersected(self.document_rect())
+        if source.isEmpty():
+            return
+        target = QRect(left // level, top // level, -(-source.width() // level), -(-source.height() // level))
+
+        # Render the region straight at mip resolution rather than via the full-size tiles
+        painter = QPainter(self.mini_canvas_mip)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.setClipRect(target)
+        painter.scale(1 / level, 1 / level)
+        self.paint_document(painter, source)
+        painter.end()
+
     def update_mini_canvas(self):
         if hasattr(self, "mini_canvas_label") and hasattr(self, "mini_canvas_dialog"):
+            self.mini_canvas_timer.stop()
+            self.update_mini_canvas_mip()
+
             # Get the available size of the QLabel in the dialog
             label_size = self.mini_canvas_label.size()
             
-            # Scale the canvas to fit the QLabel while maintaining aspect ratio
-            scaled_pixmap = self.canvas.scaled(
+            # Scale the small mip level, not the full canvas, to fit the QLabel
+            scaled_pixmap = self.mini_canvas_mip.scaled(
                 label_size.width(),
                 label_size.height(),
                 Qt.KeepAspectRatio,
@@ -827,7 +2120,8 @@ class CanvasWindow(QMainWindow):
                 file_path += ".png"  # Ensure the file has a .png extension
             try:
                 # Save the current canvas as an image
-                self.canvas.save(file_path, "PNG")
+                self.flush_redraw()
+                self.render_document().save(file_path, "PNG")
                 print(f"Canvas exported as PNG to {file_path}")
             except Exception as e:
                 print(f"Failed to export as PNG: {e}")
@@ -841,8 +2135,8 @@ class CanvasWindow(QMainWindow):
 
         # List selected objects
         selected_objects_list = QListWidget(dialog)
-        for obj in self.objects:
-            item = QListWidgetItem(f"Image {self.objects.index(obj) + 1}")
+        for index, obj in enumerate(self.objects):
+            item = QListWidgetItem(f"Image {index + 1}")
             item.setCheckState(Qt.Unchecked)
             selected_objects_list.addItem(item)
         layout.addWidget(selected_objects_list)
@@ -887,55 +2181,22 @@ class CanvasWindow(QMainWindow):
         # Extract image data from selected objects
         cv_images = []
         for obj in selected_objects:
-            qt_image = obj['pixmap'].toImage()
-            qt_image = qt_image.convertToFormat(QImage.Format_RGB32)
-            width, height = qt_image.width(), qt_image.height()
-            ptr = qt_image.bits()
-            ptr.setsize(qt_image.byteCount())
-            cv_image = np.array(ptr).reshape((height, width, 4))[:, :, :3]  # Extract RGB channels (ignore alpha)
-            cv_images.append(cv_image)
-
-        # Normalize sizes based on orientation
-        if orientation == "Side by Side":
-            target_height = min(img.shape[0] for img in cv_images)
-            resized_images = [
-                cv2.resize(img, (int(img.shape[1] * target_height / img.shape[0]), target_height)) for img in cv_images
-            ]
-            try:
-                merged_image = cv2.hconcat(resized_images)  # Merge horizontally
-            except cv2.error as e:
-                QMessageBox.critical(self, "Merge Error", f"Failed to merge images: {e}")
-                return
-        elif orientation == "Up and Down":
-            target_width = min(img.shape[1] for img in cv_images)
-            resized_images = [
-                cv2.resize(img, (target_width, int(img.shape[0] * target_width / img.shape[1]))) for img in cv_images
-            ]
-            try:
-                merged_image = cv2.vconcat(resized_images)  # Merge vertically
-            except cv2.error as e:
-                QMessageBox.critical(self, "Merge Error", f"Failed to merge images: {e}")
-                return
+            pixels = image_array(argb32(self.object_image(obj)))
+            cv_images.append(cv2.cvtColor(pixels, cv2.COLOR_BGRA2BGR))  # Drop alpha
 
-        # Convert BGR (OpenCV) to RGB (PyQt)
-        merged_image = cv2.cvtColor(merged_image, cv2.COLOR_BGR2RGB)
+        # Resize and concatenate on the worker pool
+        self.jobs.submit(('merge',), merge_bgr_images, cv_images, orientation, on_done=self.add_merged_image,
+                         on_failed=lambda message: QMessageBox.critical(self, "Merge Error", f"Failed to merge images: {message}"))
 
-        # Convert back to QPixmap
-        h, w, ch = merged_image.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(merged_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qt_image)
+    def add_merged_image(self, merged_image):
+        if merged_image is None:
+            return
 
         # Add the merged image to the canvas
-        self.objects.append({
-            'pixmap': pixmap,
-            'original_pixmap': pixmap,
-            'x': 50,
-            'y': 50,
-            'rect': QRect(50, 50, pixmap.width(), pixmap.height())
-        })
+        self.objects.append(self.new_object(merged_image, 50, 50))
+        self.index_object(self.objects[-1])
         
-        self.add_thumbnail(pixmap, "Merged Image")
+        self.add_thumbnail(self.object_pixmap(self.objects[-1]), "Merged Image")
         self.redraw_canvas()
         
     def toggle_thumbnail_panel(self, checked):
@@ -953,67 +2214,29 @@ class CanvasWindow(QMainWindow):
     def zoomin_canvas(self):
         """Zoom in the entire canvas by increasing its scale."""
         self.canvas_scale *= 1.1  # Increase scale by 10%
+        self.begin_interaction()
         self.scale_canvas()
+        self.refine_timer.start()  # Smooth pass once the zoom clicks stop
 
     def zoomout_canvas(self):
         """Zoom out the entire canvas by decreasing its scale."""
         self.canvas_scale /= 1.1  # Decrease scale by 10%
+        self.begin_interaction()
         self.scale_canvas()
+        self.refine_timer.start()  # Smooth pass once the zoom clicks stop
 
     def reset_canvas(self):
         """Reset the canvas to its original size and scale."""
         self.canvas_scale = 1.0  # Reset scale
-        self.canvas = self.original_canvas.copy()  # Restore the original canvas
-        self.canvas_label.setPixmap(self.canvas)  # Update the display
-        self.redraw_canvas()  # Refresh the canvas with all objects
+        self.scale_canvas()
 
     def scale_canvas(self):
-        """Scale the canvas and all elements."""
-        # Scale the canvas size
-        new_width = int(self.original_canvas.width() * self.canvas_scale)
-        new_height = int(self.original_canvas.height() * self.canvas_scale)
-
-        # Scale the canvas pixmap
-        scaled_canvas = self.original_canvas.scaled(new_width, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.canvas = scaled_canvas
-
-        # Adjust canvas label size
-        self.canvas_label.setPixmap(self.canvas)
-        self.canvas_label.resize(new_width, new_height)
-
-        # Scale all objects, shapes, and drawings
-        for obj in self.objects:
-            obj_width = int(obj['original_pixmap'].width() * self.canvas_scale)
-            obj_height = int(obj['original_pixmap'].height() * self.canvas_scale)
-            obj['pixmap'] = obj['original_pixmap'].scaled(obj_width, obj_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            obj['x'] = int(obj['x'] * self.canvas_scale)
-            obj['y'] = int(obj['y'] * self.canvas_scale)
-            obj['rect'] = QRect(obj['x'], obj['y'], obj_width, obj_height)
-
-        # Scale shapes
-        for shape in self.elements:
-            if shape['type'] == 'shape':
-                scaled_path = QPainterPath()
-                for point in shape['path'].toFillPolygon():
-                    scaled_point = QPointF(point.x() * self.canvas_scale, point.y() * self.canvas_scale)
-                    if not scaled_path.elementCount():
-                        scaled_path.moveTo(scaled_point)
-                    else:
-                        scaled_path.lineTo(scaled_point)
-                shape['path'] = scaled_path
-
-        # Scale text
-        for text_element in self.elements:
-            if text_element['type'] == 'text':
-                text_element['position'] = QPointF(
-                    text_element['position'].x() * self.canvas_scale,
-                    text_element['position'].y() * self.canvas_scale,
-                )
-                font = text_element['font']
-                font.setPointSize(int(font.pointSize() * self.canvas_scale))
-                text_element['font'] = font
+        """Show the canvas at canvas_scale.
 
-        self.redraw_canvas()
+        Zoom is only a view transform: elements and objects keep their
+        document coordinates and are scaled as the visible tiles render.
+        """
+        self.create_view_tiles()
 
 
     def upload_image(self):
@@ -1022,31 +2245,22 @@ class CanvasWindow(QMainWindow):
             self, "Select an Image", "", "Image Files (*.png *.jpg *.jpeg *.bmp);;All Files (*)", options=options
         )
         if file_path:
-            image = cv2.imread(file_path)
-            if image is not None:
-                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                h, w, ch = image.shape
-                bytes_per_line = ch * w
-                qt_image = QImage(image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-
-                scaled_image = QPixmap.fromImage(qt_image).scaled(
-                    self.canvas_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-                )
-
-                # Store the image and its position
-                # Store the image, original pixmap, and position
-                self.objects.append({
-                    'pixmap': scaled_image,
-                    'original_pixmap': scaled_image,  # Store the original pixmap for reference
-                    'x': 50,
-                    'y': 50,
-                    'rect': QRect(50, 50, scaled_image.width(), scaled_image.height())  # Store position and size
-                })
-                # Add thumbnail
-                self.add_thumbnail(scaled_image, f"Image {len(self.objects)}")
-
-                # Redraw canvas
-                self.redraw_canvas()
+            # Decode on the worker pool; the object is added once the pixels are ready
+            self.jobs.submit(('upload', file_path), decode_image, file_path, self.scroll_area.viewport().size(),
+                             on_done=self.add_uploaded_image)
+
+    def add_uploaded_image(self, image):
+        if image is None:
+            return  # Not a readable image
+
+        # Store the image, original pixels, and position
+        self.objects.append(self.new_object(image, 50, 50))
+        self.index_object(self.objects[-1])
+        # Add thumbnail
+        self.add_thumbnail(self.object_pixmap(self.objects[-1]), f"Image {len(self.objects)}")
+
+        # Redraw canvas
+        self.redraw_canvas()
                 
     def toggle_rotation_mode(self):
         self.rotate_mode_active = self.rotation_button.isChecked()
@@ -1062,36 +2276,25 @@ class CanvasWindow(QMainWindow):
     def apply_rotation(self, angle):
         if self.selected_object:
             # Update the rotation angle for the selected object
+            dirty_rect = self.object_damage(self.selected_object)
             self.selected_object['rotation'] = angle
-            self.redraw_canvas()
+            self.object_changed(self.selected_object, dirty_rect)
             
     def scale_selected_object(self):
         if self.selected_object:
             scale_percent = self.scale_slider.value() / 100.0  # Slider value as a percentage
+            if self.interactive_render:
+                self.refine_actions['scale'] = self.scale_selected_object
 
-            original_pixmap = self.selected_object['original_pixmap']
-            new_width = int(original_pixmap.width() * scale_percent)
-            new_height = int(original_pixmap.height() * scale_percent)
-
-            # Create a scaled version of the original pixmap
-            scaled_pixmap = original_pixmap.scaled(new_width, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-            # Apply any color transformation
-            if 'color_mode' in self.selected_object:
-                scaled_pixmap = self.apply_color_transformation(scaled_pixmap, self.selected_object['color_mode'])
-
-            # Update the pixmap with the scaled and transformed version
-            self.selected_object['pixmap'] = scaled_pixmap
-            # Update the rectangle to match the new size
-            self.selected_object['rect'] = QRect(self.selected_object['rect'].x(), self.selected_object['rect'].y(), new_width, new_height)
-
-            self.redraw_canvas()
+            # Replaces any earlier scale in the op stack; the rest is kept
+            self.push_object_op(self.selected_object, ('scale', scale_percent))
             
     def translate_image(self):
         if self.selected_object:
             # Get values from sliders
             x = self.x_translation_slider.value()
             y = self.y_translation_slider.value()
+            dirty_rect = self.object_damage(self.selected_object)
 
             # Update the selected object's position
             self.selected_object['x'] = x
@@ -1100,8 +2303,8 @@ class CanvasWindow(QMainWindow):
             # Update the QRect associated with the object
             self.selected_object['rect'].moveTo(x, y)
 
-            # Redraw the canvas to reflect the changes
-            self.redraw_canvas()
+            # Repaint only the area the object left and the area it moved to
+            self.object_changed(self.selected_object, dirty_rect)
 
     def translate_image_from_input(self):
         if self.selected_object:
@@ -1116,81 +2319,415 @@ class CanvasWindow(QMainWindow):
             # Update sliders to reflect input values
             self.x_translation_slider.setValue(x)
             self.y_translation_slider.setValue(y)
+            dirty_rect = self.object_damage(self.selected_object)
 
-            # Update the object's position in `self.objects`
-            for obj in self.objects:
-                if obj == self.selected_object:  # Match the selected object
-                    obj['x'] = x
-                    obj['y'] = y
-                    obj['rect'].moveTo(x, y)  # Update the QRect position
-                    break
+            # Move the selected object itself; objects hold QImages, so == would match any with equal pixels
+            obj = self.selected_object
+            obj['x'] = x
+            obj['y'] = y
+            obj['rect'].moveTo(x, y)  # Update the QRect position
 
             # Redraw the canvas with the updated position
-            self.redraw_canvas()
+            self.object_changed(self.selected_object, dirty_rect)
 
 
-    def redraw_canvas(self):
-        self.create_canvas(self.canvas.width(), self.canvas.height())
-        painter = QPainter(self.canvas)
-        
-        # Draw all persistent elements
-        for element in self.elements:
-            if element['type'] == 'drawing':
-                painter.setPen(element['pen'])
-                painter.drawPath(element['path'])
-            elif element['type'] == 'shape':
-                painter.setPen(element['pen'])
-                painter.drawPath(element['path'])
-            elif element['type'] == 'text':
-                painter.setFont(element['font'])
-                painter.setPen(element['pen'])
-                painter.drawText(element['position'], element['text'])
-
-        # Draw all objects
-        for obj in self.objects:
-            transform = QTransform()
-            transform.translate(obj['x'] + obj['pixmap'].width() / 2, obj['y'] + obj['pixmap'].height() / 2)
-            transform.rotate(obj.get('rotation', 0))
-            transform.translate(-obj['pixmap'].width() / 2, -obj['pixmap'].height() / 2)
-            rotated_pixmap = obj['pixmap'].transformed(transform, Qt.SmoothTransformation)
-            painter.drawPixmap(obj['x'], obj['y'], rotated_pixmap)
+    def show_job_progress(self, active):
+        self.job_progress.setValue(0)
+        self.job_progress.setVisible(active > 0)
+        self.job_cancel_button.setVisible(active > 0)
 
-        if self.selected_object:
-            painter.setPen(QPen(Qt.red, 2, Qt.SolidLine))
-            painter.drawRect(self.selected_object['rect'])
+    def cancel_jobs(self):
+        # Object evaluations keep running; the op stack still needs their result
+        for name in list(self.jobs.jobs):
+            if name[0] != 'object':
+                self.jobs.cancel(name)
 
-        # Draw the crop rectangle, if defined
-        if self.crop_mode_active and self.crop_rect:
-            painter.setPen(Qt.red)
-            painter.drawRect(self.crop_rect)
+    def closeEvent(self, event):
+        self.jobs.cancel_all()
+        self.jobs.wait()
+        super().closeEvent(event)
 
-        painter.end()
-        self.canvas_label.setPixmap(self.canvas)
+    def begin_interaction(self):
+        """Switch to fast nearest-neighbour transforms for the duration of a gesture."""
+        self.interactive_render = True
+
+    def end_interaction(self):
+        """Leave interactive mode and redo everything rendered fast at full quality."""
+        self.refine_timer.stop()
+        if not self.interactive_render:
+            return
+        self.interactive_render = False
+        actions = list(self.refine_actions.values())
+        self.refine_actions.clear()
+        for action in actions:
+            action()
+        if self.fast_rendered_rect is not None:
+            self.schedule_redraw(self.fast_rendered_rect)
+            self.fast_rendered_rect = None
+
+    def rotated_pixmap(self, obj):
+        """Return the object's pixmap rotated for display, reusing the cached result."""
+        pixmap = self.object_pixmap(obj)
+        angle = obj.get('rotation', 0)
+        if not angle:
+            return pixmap
+
+        key = (self.object_image(obj).cacheKey(), angle)
+        rotated = self.transform_cache.get(key)
+        if rotated is None:
+            transform = QTransform()
+            transform.translate(obj['x'] + pixmap.width() / 2, obj['y'] + pixmap.height() / 2)
+            transform.rotate(angle)
+            transform.translate(-pixmap.width() / 2, -pixmap.height() / 2)
+            if self.interactive_render:
+                # Throwaway preview; not cached, the refinement pass renders it smoothly
+                return pixmap.transformed(transform, Qt.FastTransformation)
+            rotated = pixmap.transformed(transform, Qt.SmoothTransformation)
+
+            # The object's pixmap or angle changed, so its previous entry is stale
+            previous_key = self.transform_keys.get(id(obj))
+            if previous_key is not None and previous_key != key:
+                self.transform_cache.discard(previous_key)
+            self.transform_cache.put(key, rotated)
+            self.transform_keys[id(obj)] = key
+        return rotated
+
+    def new_object(self, image, x, y):
+        """Create an object dict at (x, y) with image as its source and an empty op stack."""
+        image = premultiplied(image)
+        return {
+            'image': image,
+            'original_image': image,
+            'ops': [],
+            'x': x,
+            'y': y,
+            'rect': QRect(x, y, image.width(), image.height())
+        }
+
+    def set_object_source(self, obj, image):
+        """Give an object new source pixels and clear its op stack."""
+        self.invalidate_object(obj)
+        obj['original_image'] = obj['image'] = premultiplied(image)
+        obj['ops'] = []
+
+    def invalidate_object(self, obj):
+        # Drop the evaluated pixels; they are rebuilt from the op stack when next needed
+        image = obj.get('image')
+        if image is not None:
+            self.transform_cache.discard((image.cacheKey(), 'pixmap'))
+        obj['image'] = None
+
+    def push_object_op(self, obj, op):
+        """Record an edit in an object's op stack and repaint it.
+
+        Color mode, gamma and scale are settings, so a new value replaces
+        the old one in place. Repeating the last flip or negative undoes it.
+        Everything else is appended. Large objects are re-evaluated on the
+        worker pool; small ones when they are next drawn or read.
+        """
+        if 'loader' in obj:
+            self.object_image(obj)  # Edits apply to the loaded pixels
+        dirty_rect = self.object_damage(obj)
+        previous = self.rotated_pixmap(obj) if obj['image'] is not None else None
+        ops = obj['ops']
+        kind = op[0]
+        if kind in ('color_mode', 'gamma', 'scale'):
+            for index, existing in enumerate(ops):
+                if existing[0] == kind:
+                    ops[index] = op
+                    break
+            else:
+                ops.append(op)
+        elif kind in ('flip', 'negative') and ops and ops[-1] == op:
+            ops.pop()
+        else:
+            ops.append(op)
+        self.invalidate_object(obj)
+        obj['rect'].setSize(self.object_size(obj))
+        self.evaluate_object_async(obj, previous)
+        self.object_changed(obj, dirty_rect)
+
+    def evaluate_object_async(self, obj, previous=None):
+        """Evaluate obj's op stack on the worker pool, showing previous until it is ready.
+
+        A newer edit to the same object supersedes the running job.
+        """
+        source, ops, fast = obj['original_image'], list(obj['ops']), self.interactive_render
+        image, steps = self.plan_ops(source, ops, fast)
+        if not steps or image.width() * image.height() < self.async_min_pixels:
+            self.jobs.cancel(('object', id(obj)))
+            obj.pop('proxy', None)
+            return  # Cheap enough to evaluate when drawn
+        if previous is not None and 'proxy' not in obj:
+            obj['proxy'] = previous  # Stretched over the new bounds meanwhile
+
+        def evaluate(job):
+            results = self.run_op_steps(job, source, ops, image, steps, fast)
+            return None if results is None else (results, premultiplied(results[-1][1]))
+
+        def publish(result):
+            if not self.has_object(obj) or obj['ops'] != ops or obj['original_image'] is not source:
+                return
+            results, evaluated = result
+            for key, step_image in results:
+                self.op_cache.put(key, step_image)
+            dirty_rect = self.object_damage(obj)
+            obj['image'] = evaluated
+            obj.pop('proxy', None)
+            self.object_changed(obj, dirty_rect)
+
+        def failed(message):
+            # Fall back to evaluating inline when next drawn
+            if obj.pop('proxy', None) is not None:
+                self.object_changed(obj)
+
+        self.jobs.submit(('object', id(obj)), evaluate, on_done=publish, on_failed=failed)
+
+    def object_image(self, obj):
+        """Current pixels of obj: its source with the op stack applied, evaluated on first use."""
+        if 'loader' in obj:
+            self.object_loaded(obj, obj['loader']())  # Needed before its background load is done
+        image = obj['image']
+        if image is None:
+            image = premultiplied(self.evaluate_ops(obj['original_image'], obj['ops'], self.interactive_render))
+            obj['image'] = image
+        return image
+
+    def object_size(self, obj):
+        """Size of obj's evaluated pixels, worked out from the op stack without evaluating it."""
+        if 'loader' in obj:
+            return obj['rect'].size()  # Not loaded yet; saved with no ops applied
+        size = obj['original_image'].size()
+        for op in obj['ops']:
+            if op[0] == 'crop':
+                size = self.crop_op_rect(size, op[1]).size()
+            elif op[0] == 'scale':
+                size = self.scale_op_size(size, op[1])
+        return size
+
+    @staticmethod
+    def crop_op_rect(size, fractions):
+        # Crops are stored as fractions of their input so they survive rescaling
+        x, y, width, height = fractions
+        return QRect(round(x * size.width()), round(y * size.height()),
+                     max(1, round(width * size.width())), max(1, round(height * size.height()))).intersected(QRect(QPoint(), size))
+
+    @staticmethod
+    def scale_op_size(size, scale_percent):
+        box = QSize(max(1, int(size.width() * scale_percent)), max(1, int(size.height() * scale_percent)))
+        return size.scaled(box, Qt.KeepAspectRatio)
+
+    def op_key(self, source, ops, fast):
+        # Fast and smooth scaling give different pixels, so only they are told apart
+        fast = fast and any(op[0] == 'scale' for op in ops)
+        return (source.cacheKey(), tuple(ops), fast)
+
+    def evaluate_ops(self, source, ops, fast=False):
+        """Apply ops to source, resuming from the longest memoized prefix.
+
+        Runs of point operations (gamma, negative) are fused into one LUT
+        pass; the result after each run or other op is memoized.
+        """
+        image, steps = self.plan_ops(source, ops, fast)
+        for key, image in self.run_op_steps(None, source, ops, image, steps, fast):
+            self.op_cache.put(key, image)
+        return image
+
+    def plan_ops(self, source, ops, fast=False):
+        """Split ops into steps and find the longest memoized prefix.
+
+        Returns the image to start from and the (end, group) steps still to run.
+        """
+        steps = op_steps(ops)
+        image, start = source, 0
+        for step in range(len(steps) - 1, -1, -1):
+            cached = self.op_cache.get(self.op_key(source, ops[:steps[step][0]], fast))
+            if cached is not None:
+                image, start = cached, step + 1
+                break
+        return image, steps[start:]
+
+    def run_op_steps(self, job, source, ops, image, steps, fast=False):
+        """Run planned steps and return [(cache key, image)] for each, or None if job was cancelled.
+
+        Touches no shared state, so it can run on a pool thread.
+        """
+        results = []
+        for index, (end, group) in enumerate(steps):
+            if job is not None:
+                if job.cancelled:
+                    return None
+                job.report(100 * index // len(steps))
+            image = self.apply_op_step(image, group, fast)
+            results.append((self.op_key(source, ops[:end], fast), image))
+        return results
+
+    def apply_op_step(self, image, group, fast=False):
+        """Apply one step of an op stack (a single op or a fused run of point ops)."""
+        kind = group[0][0]
+        if kind in ('gamma', 'negative'):
+            # Compose the per-channel tables, then make one pass over the pixels
+            table = np.tile(np.arange(256, dtype=np.uint8)[:, None], (1, 4))
+            for op in group:
+                if op[0] == 'gamma':
+                    op_table = gamma_table(round(op[1], 2))[0]
+                else:
+                    op_table = np.tile((255 - np.arange(256, dtype=np.uint8))[:, None], (1, 4))
+                    op_table[:, 3] = np.arange(256)  # Alpha is left as is
+                table = op_table[table, np.arange(4)]
+            return array_image(cv2.LUT(image_array(argb32(image)), table.reshape(1, 256, 4)))
+
+        op = group[0]
+        if kind == 'color_mode':
+            return self.apply_color_transformation(image, op[1])
+        if kind == 'bitwise':
+            return self.apply_bitwise(image, op[1])
+        if kind == 'crop':
+            return image.copy(self.crop_op_rect(image.size(), op[1]))
+        if kind == 'flip':
+            return image.mirrored(op[1], op[2])
+        if kind == 'scale':
+            size = self.scale_op_size(image.size(), op[1])
+            if size == image.size():
+                return image  # scaled() would return a shallow copy that can outlive a borrowed buffer
+            return image.scaled(size, Qt.IgnoreAspectRatio,
+                                Qt.FastTransformation if fast else Qt.SmoothTransformation)
+        if kind == 'fill':
+            filled = QImage(image)
+            painter = QPainter(filled)
+            painter.setBrush(QColor.fromRgba(op[1]))
+            painter.setPen(Qt.NoPen)
+            painter.drawRect(filled.rect())
+            painter.end()
+            return filled
+        return image
+
+    def object_pixmap(self, obj, key='image'):
+        """Display pixmap for an object's 'image' (or 'original_image'), derived once and cached."""
+        image = self.object_image(obj) if key == 'image' else obj[key]
+        cache_key = (image.cacheKey(), 'pixmap')
+        pixmap = self.transform_cache.get(cache_key)
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(image)
+            self.transform_cache.put(cache_key, pixmap)
+        return pixmap
+
+    def object_bounds(self, obj):
+        """Canvas area covered by an object's (rotated) pixmap."""
+        size = self.object_size(obj)
+        rotated = QTransform().rotate(obj.get('rotation', 0)).mapRect(QRect(0, 0, size.width(), size.height()))
+        return QRect(obj['x'], obj['y'], rotated.width(), rotated.height())
+
+    def object_damage(self, obj):
+        """Region to repaint when an object changes, including its selection outline."""
+        return self.object_bounds(obj).united(obj['rect']).adjusted(-2, -2, 2, 2)
+
+    def index_object(self, obj):
+        # Keep the spatial index in step with the object's current bounds
+        self.object_index.insert(obj, self.object_damage(obj))
+
+    def rebuild_object_index(self):
+        self.object_index.clear()
+        for obj in self.objects:
+            self.index_object(obj)
+
+    def select_object(self, obj):
+        """Select obj, or nothing for None, and bring the tools that follow the selection along."""
+        self.selected_object = obj
+        if self.gamma_object is not None and self.gamma_object is not obj:
+            self.release_gamma_object()
+        self.update_histogram()
+
+    def object_changed(self, obj, old_damage=None):
+        """Re-index an object after it moved, resized or rotated and repaint what it touched."""
+        if not self.has_object(obj):
+            return  # Deleted or from a closed project; indexing it would paint it again
+        self.index_object(obj)
+        new_damage = self.object_damage(obj)
+        self.schedule_redraw(new_damage if old_damage is None else old_damage.united(new_damage))
+        self.update_overlay()
+        self.update_histogram()
+
+    def object_contains(self, obj, pos):
+        """Hit-test a canvas position against the object as it is drawn, rotation included."""
+        angle = obj.get('rotation', 0)
+        if not angle:
+            return obj['rect'].contains(pos)
+        width, height = obj['rect'].width(), obj['rect'].height()
+        center = QRectF(self.object_bounds(obj)).center()
+        transform = QTransform()
+        transform.translate(center.x(), center.y())
+        transform.rotate(angle)
+        transform.translate(-width / 2, -height / 2)
+        local, invertible = transform.inverted()
+        if not invertible:
+            return False
+        point = local.map(QPointF(pos))
+        return 0 <= point.x() < width and 0 <= point.y() < height
+
+    def pick_object(self, pos):
+        """Return the topmost object under pos, or None."""
+        for obj in reversed(self.object_index.query_point(pos)):
+            if 'loader' not in obj and self.object_contains(obj, pos):
+                return obj
+        return None
+
+    def schedule_redraw(self, dirty_rect=None):
+        """Mark the canvas (or dirty_rect) for repaint on the next frame tick.
+
+        Any number of requests within one frame interval collapse into a
+        single redraw_canvas call covering the union of their damage.
+        """
+        if dirty_rect is None:
+            self.pending_full_redraw = True
+        elif self.pending_dirty_rect is None:
+            self.pending_dirty_rect = QRect(dirty_rect)
+        else:
+            self.pending_dirty_rect = self.pending_dirty_rect.united(dirty_rect)
+        if not self.redraw_timer.isActive():
+            self.redraw_timer.start()
+
+    def flush_redraw(self):
+        """Render any scheduled redraw right away, e.g. before reading or saving the canvas."""
+        self.redraw_timer.stop()
+        if self.pending_full_redraw:
+            self.redraw_canvas()
+        elif self.pending_dirty_rect is not None:
+            dirty_rect = self.pending_dirty_rect
+            self.pending_dirty_rect = None
+            self.redraw_canvas(dirty_rect)
+
+    def redraw_canvas(self, dirty_rect=None):
+        """Invalidate the canvas, or only dirty_rect when the caller knows what changed."""
+        if dirty_rect is None:
+            # A full repaint covers anything that was still scheduled
+            self.redraw_timer.stop()
+            self.pending_full_redraw = False
+            self.pending_dirty_rect = None
+        if dirty_rect is None:
+            dirty_rect = self.document_rect()
+        else:
+            dirty_rect = dirty_rect.intersected(self.document_rect())
+            if dirty_rect.isEmpty():
+                return
+
+        # Tiles re-render lazily, and only once they are painted in view
+        self.display_tiles.mark_dirty(dirty_rect)
+        self.canvas_label.update(self.display_tiles.to_view(dirty_rect))
+        self.update_overlay()
         
-        # Update the mini canvas if open
-        self.update_mini_canvas()
+        # Let the mini canvas pick up the change on its own cadence
+        self.mark_mini_canvas_dirty(dirty_rect)
 
     def flip_horizontal(self):
         if self.selected_object:
-            for obj in self.objects:
-                if obj == self.selected_object:
-                    # Flip the pixmap horizontally
-                    flipped_pixmap = obj['pixmap'].transformed(QTransform().scale(-1, 1))
-                    obj['pixmap'] = flipped_pixmap  # Update the object's pixmap
-                    obj['original_pixmap'] = flipped_pixmap  # Update original_pixmap too if needed
-                    break
-            self.redraw_canvas()
+            # Flip the pixels horizontally
+            self.push_object_op(self.selected_object, ('flip', True, False))
 
     def flip_vertical(self):
         if self.selected_object:
-            for obj in self.objects:
-                if obj == self.selected_object:
-                    # Flip the pixmap vertically
-                    flipped_pixmap = obj['pixmap'].transformed(QTransform().scale(1, -1))
-                    obj['pixmap'] = flipped_pixmap  # Update the object's pixmap
-                    obj['original_pixmap'] = flipped_pixmap  # Update original_pixmap too if needed
-                    break
-            self.redraw_canvas()
+            # Flip the pixels vertically
+            self.push_object_op(self.selected_object, ('flip', False, True))
             
     def toggle_drag_mode(self):
         self.drag_mode_active = self.drag_button.isChecked()
@@ -1200,71 +2737,22 @@ class CanvasWindow(QMainWindow):
         self.crop_mode_active = self.crop_button.isChecked()
         if not self.crop_mode_active:
             self.crop_rect = None  # Clear the crop rectangle if exiting crop mode
-        self.redraw_canvas()
+        self.update_overlay()
         
     def convert_color(self, color_mode):
         if not self.selected_object:
             return
 
-        # Update the color mode for the selected object
-        self.selected_object['color_mode'] = color_mode
-
-        # Always start from the original pixmap
-        original_pixmap = self.selected_object['original_pixmap']
-        qt_image = original_pixmap.toImage()
-
-        # Ensure QImage is in the correct format
-        qt_image = qt_image.convertToFormat(QImage.Format_RGB32)
-
-        width, height = qt_image.width(), qt_image.height()
-        ptr = qt_image.bits()
-        ptr.setsize(qt_image.byteCount())
-        cv_image = np.array(ptr).reshape((height, width, 4))[:, :, :3]
-
-        # Convert color based on mode
-        if color_mode == "RGB":
-            converted_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
-        elif color_mode == "HSV":
-            converted_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2HSV)
-        elif color_mode == "GRAY":
-            converted_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
-            converted_image = cv2.cvtColor(converted_image, cv2.COLOR_GRAY2BGR)
-        elif color_mode == "CIE":
-            converted_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2Lab)
-        elif color_mode == "HLS":
-            converted_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2HLS)
-        elif color_mode == "YCrCb":
-            converted_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2YCrCb)
-        else:
+        if color_mode not in ("RGB", "HSV", "GRAY", "CIE", "HLS", "YCrCb"):
             return  # Invalid mode
 
-        # Convert back to QPixmap
-        h, w, ch = converted_image.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(converted_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        new_pixmap = QPixmap.fromImage(qt_image)
-
-        # Scale the converted pixmap if scaling is active
-        scale_percent = self.scale_slider.value() / 100.0  # Current scale
-        scaled_pixmap = new_pixmap.scaled(
-            int(new_pixmap.width() * scale_percent),
-            int(new_pixmap.height() * scale_percent),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        )
-
-        # Update the selected object's pixmap and redraw
-        self.selected_object['pixmap'] = scaled_pixmap
-        self.redraw_canvas()
-
-    def apply_color_transformation(self, pixmap, color_mode):
-        qt_image = pixmap.toImage()
-        qt_image = qt_image.convertToFormat(QImage.Format_RGB32)
+        # Replaces any earlier color mode in the op stack
+        self.push_object_op(self.selected_object, ('color_mode', color_mode))
 
-        width, height = qt_image.width(), qt_image.height()
-        ptr = qt_image.bits()
-        ptr.setsize(qt_image.byteCount())
-        cv_image = np.array(ptr).reshape((height, width, 4))[:, :, :3]
+    def apply_color_transformation(self, image, color_mode):
+        """Return image converted to color_mode, with the converted channels shown as R, G, B."""
+        pixels = image_array(argb32(image))
+        cv_image = cv2.cvtColor(pixels, cv2.COLOR_BGRA2BGR)
 
         # Apply color transformation
         if color_mode == "RGB":
@@ -1281,127 +2769,140 @@ class CanvasWindow(QMainWindow):
         elif color_mode == "YCrCb":
             converted_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2YCrCb)
         else:
-            return pixmap  # Return unchanged if no valid color mode
+            return image  # Return unchanged if no valid color mode
 
-        # Convert back to QPixmap
-        h, w, ch = converted_image.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(converted_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        return QPixmap.fromImage(qt_image)
+        # Converted channels are displayed as R, G, B, so reverse them into memory order
+        return bgr_image(converted_image[:, :, ::-1], pixels[:, :, 3])
         
     def adjust_gamma(self):
         if not self.selected_object:
             return
 
-        # Prompt user for gamma value
-        gamma, ok = QInputDialog.getDouble(self, "Gamma Adjustment", "Enter Gamma Value (e.g., 0.1 - 5.0):", 1.0, 0.1, 5.0, 2)
-        if not ok:
-            return  # User canceled
-
-        # Get the original pixmap
-        original_pixmap = self.selected_object['original_pixmap']
-        qt_image = original_pixmap.toImage()
-
-        # Convert QImage to OpenCV format
-        qt_image = qt_image.convertToFormat(QImage.Format_RGB32)
-        width, height = qt_image.width(), qt_image.height()
-        ptr = qt_image.bits()
-        ptr.setsize(qt_image.byteCount())
-        cv_image = np.array(ptr).reshape((height, width, 4))[:, :, :3]  # Extract RGB channels
-
-        # Apply gamma correction
-        inv_gamma = 1.0 / gamma
-        table = np.array([(i / 255.0) ** inv_gamma * 255 for i in range(256)]).astype("uint8")
-        gamma_corrected_image = cv2.LUT(cv_image, table)
-
-        # Convert back from BGR to RGB for display
-        gamma_corrected_image = cv2.cvtColor(gamma_corrected_image, cv2.COLOR_BGR2RGB)
-
-        # Convert back to QPixmap
-        h, w, ch = gamma_corrected_image.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(gamma_corrected_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        new_pixmap = QPixmap.fromImage(qt_image)
-
-        # Update the selected object's pixmap and redraw
-        self.selected_object['pixmap'] = new_pixmap
-        self.redraw_canvas()
+        # Non-modal gamma slider, created on first use and reused
+        if not hasattr(self, "gamma_dialog"):
+            self.gamma_dialog = QDialog(self)
+            self.gamma_dialog.setWindowTitle("Gamma Adjustment")
+            layout = QVBoxLayout(self.gamma_dialog)
+            self.gamma_value_label = QLabel(self.gamma_dialog)
+            layout.addWidget(self.gamma_value_label)
+            self.gamma_slider = QSlider(Qt.Horizontal, self.gamma_dialog)
+            self.gamma_slider.setRange(10, 500)  # Gamma 0.1 - 5.0 in hundredths
+            self.gamma_slider.sliderPressed.connect(self.begin_gamma_preview)
+            self.gamma_slider.valueChanged.connect(self.preview_gamma)
+            self.gamma_slider.sliderReleased.connect(self.commit_gamma)
+            layout.addWidget(self.gamma_slider)
+
+        self.gamma_object = self.selected_object
+        self.gamma_proxy_source = None
+        self.gamma_proxy_ops = []
+        self.gamma_slider.blockSignals(True)
+        self.gamma_slider.setValue(100)
+        self.gamma_slider.blockSignals(False)
+        self.gamma_value_label.setText("Gamma: 1.00")
+        self.gamma_dialog.show()
+
+    def has_object(self, obj):
+        # Identity, not ==: equal-looking dicts would compare their images pixel by pixel
+        return any(existing is obj for existing in self.objects)
+
+    def release_gamma_object(self):
+        # The gamma dialog only edits the selected object; close it when that goes away
+        self.gamma_object = None
+        self.gamma_proxy_source = None
+        self.gamma_dialog.hide()
+
+    def begin_gamma_preview(self):
+        # Previews run the object's own stack at on-screen size, with the slider's gamma where
+        # push_object_op will put it: in place of the current gamma, or last if there is none
+        obj = self.gamma_object
+        if not self.has_object(obj):
+            return
+        self.jobs.cancel(('object', id(obj)))
+        ops = obj['ops']
+        index = next((i for i, op in enumerate(ops) if op[0] == 'gamma'), len(ops))
+
+        # Start from the longest memoized prefix and reduce it before running what is left
+        image, steps = self.plan_ops(obj['original_image'], ops[:index])
+        scale = min(self.canvas_scale, 1.0)
+        if scale < 1.0:
+            size = (image.size() * scale).expandedTo(QSize(1, 1))
+            image = image.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        for end, group in steps:
+            image = self.apply_op_step(image, group, True)
+        self.gamma_proxy_source = image
+        self.gamma_proxy_ops = ops[index + 1:]
+        self.begin_interaction()
+
+    def preview_gamma(self, value):
+        self.gamma_value_label.setText(f"Gamma: {value / 100:.2f}")
+        obj = self.gamma_object
+        if not self.has_object(obj):
+            return
+        if not self.gamma_slider.isSliderDown() or self.gamma_proxy_source is None:
+            # Keyboard and page steps have no release, so commit right away
+            self.commit_gamma()
+            return
+
+        # Show the proxy stretched over the object until the slider is released
+        image = self.gamma_proxy_source
+        for end, group in op_steps([('gamma', value / 100)] + self.gamma_proxy_ops):
+            image = self.apply_op_step(image, group, True)
+        proxy = QPixmap.fromImage(image)
+        angle = obj.get('rotation', 0)
+        if angle:
+            proxy = proxy.transformed(QTransform().rotate(angle), Qt.FastTransformation)
+        obj['proxy'] = proxy
+        self.object_changed(obj)
+
+    def commit_gamma(self):
+        obj = self.gamma_object
+        if not self.has_object(obj):
+            return
+        self.gamma_proxy_source = None
+        if self.interactive_render:
+            self.end_interaction()
+
+        # Replaces any earlier gamma; the preview stays up until the full-resolution result is ready
+        self.push_object_op(obj, ('gamma', self.gamma_slider.value() / 100))
         
     def perform_bitwise_operation(self, operation):
-        if not self.selected_object or operation == "Select Operation":
+        if not self.selected_object or operation not in ("Bitwise AND", "Bitwise OR", "Bitwise XOR"):
             return
+        self.push_object_op(self.selected_object, ('bitwise', operation))
 
-        # Get the pixmap of the selected object
-        pixmap = self.selected_object['pixmap']
-        qt_image = pixmap.toImage()
-
-        # Convert QImage to OpenCV format
-        qt_image = qt_image.convertToFormat(QImage.Format_RGB32)
-        width, height = qt_image.width(), qt_image.height()
-        ptr = qt_image.bits()
-        ptr.setsize(qt_image.byteCount())
-        cv_image = np.array(ptr).reshape((height, width, 4))[:, :, :3]  # Extract RGB channels
+    def apply_bitwise(self, image, operation):
+        # View the pixels directly
+        pixels = image_array(argb32(image))
 
         # Prepare a grayscale version for the bitwise operation
-        gray_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
+        gray_image = cv2.cvtColor(cv2.cvtColor(pixels, cv2.COLOR_BGRA2GRAY), cv2.COLOR_GRAY2BGRA)
 
         # Perform the selected bitwise operation
         if operation == "Bitwise AND":
-            result_image = cv2.bitwise_and(cv_image, cv2.cvtColor(gray_image, cv2.COLOR_GRAY2BGR))
+            result_image = cv2.bitwise_and(pixels, gray_image)
         elif operation == "Bitwise OR":
-            result_image = cv2.bitwise_or(cv_image, cv2.cvtColor(gray_image, cv2.COLOR_GRAY2BGR))
+            result_image = cv2.bitwise_or(pixels, gray_image)
         elif operation == "Bitwise XOR":
-            result_image = cv2.bitwise_xor(cv_image, cv2.cvtColor(gray_image, cv2.COLOR_GRAY2BGR))
+            result_image = cv2.bitwise_xor(pixels, gray_image)
         else:
-            return
-
-        # Convert the result back to QPixmap
-        result_image = cv2.cvtColor(result_image, cv2.COLOR_BGR2RGB)
-        h, w, ch = result_image.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(result_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        result_pixmap = QPixmap.fromImage(qt_image)
-
-        # Update the selected object's pixmap and redraw
-        self.selected_object['pixmap'] = result_pixmap
-        self.redraw_canvas()
+            return image
+        result_image[:, :, 3] = pixels[:, :, 3]  # Keep the original alpha
+        return array_image(result_image)
         
     def negative_image(self):
         if not self.selected_object:
             QMessageBox.warning(self, "Selection Error", "No object selected to apply the negative effect.")
             return
 
-        # Get the pixmap of the selected object
-        pixmap = self.selected_object['pixmap']
-        qt_image = pixmap.toImage()
-
-        # Convert QImage to OpenCV format
-        qt_image = qt_image.convertToFormat(QImage.Format_RGB32)
-        width, height = qt_image.width(), qt_image.height()
-        ptr = qt_image.bits()
-        ptr.setsize(qt_image.byteCount())
-        cv_image = np.array(ptr).reshape((height, width, 4))[:, :, :3]  # Extract RGB channels
-
-        # Apply the negative effect
-        cv_image_negative = 255 - cv_image
-
-        # Convert back to QPixmap
-        cv_image_negative = cv2.cvtColor(cv_image_negative, cv2.COLOR_BGR2RGB)
-        h, w, ch = cv_image_negative.shape
-        bytes_per_line = ch * w
-        qt_image_negative = QImage(cv_image_negative.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        negative_pixmap = QPixmap.fromImage(qt_image_negative)
-
-        # Update the pixmap of the selected object
-        self.selected_object['pixmap'] = negative_pixmap
-        self.redraw_canvas()
+        # Negative of the color channels; fused with neighbouring point ops when evaluated
+        self.push_object_op(self.selected_object, ('negative',))
 
         
     def show_original_image(self):
         if self.selected_object:
             # Retrieve the original pixmap
-            original_pixmap = self.selected_object.get('original_pixmap', None)
-            if original_pixmap:
+            original_pixmap = self.object_pixmap(self.selected_object, 'original_image')
+            if not original_pixmap.isNull():
                 # Create a dialog to display the image
                 dialog = QDialog(self)
                 dialog.setWindowTitle("Image")
@@ -1422,7 +2923,7 @@ class CanvasWindow(QMainWindow):
         
     def show_image_properties(self):
         if self.selected_object:
-            pixmap = self.selected_object['pixmap']  # Get the selected object's pixmap
+            pixmap = self.object_image(self.selected_object)  # Get the selected object's pixels
             file_name = "Unknown"  # If you save the file name during upload, fetch it here
             image_size = f"{pixmap.width()} x {pixmap.height()} px"
             image_resolution = "N/A"  # You can add logic to extract resolution if available
@@ -1439,8 +2940,9 @@ class CanvasWindow(QMainWindow):
             QMessageBox.information(self, "Image Properties", details)
 
     def mouse_press_event(self, event):
+        event = self.document_event(event)
         if self.is_drawing and event.button() == Qt.LeftButton:
-            self.last_point = event.pos()
+            self.start_drawing(event)
         elif event.button() == Qt.MiddleButton:  # Use middle mouse button for panning
             self.scroll_area.setCursor(Qt.ClosedHandCursor)
             self.pan_start_pos = event.pos()
@@ -1460,86 +2962,130 @@ class CanvasWindow(QMainWindow):
             # Start defining the crop rectangle
             self.crop_start_pos = event.pos()
             self.crop_rect = QRect(self.crop_start_pos, QSize())
+            self.update_overlay()
         elif self.drag_mode_active and event.button() == Qt.LeftButton:
             # Start dragging if an object is selected
-            click_pos = event.pos()
-            for obj in self.objects:
-                rect = obj['rect']
-                if rect.contains(click_pos):
-                    self.selected_object = obj  # Select the object
-                    self.scale_slider.setEnabled(True)  # Enable scale slider
-                    self.drag_start_pos = event.pos()
-                    return
+            obj = self.pick_object(event.pos())
+            if obj is not None:
+                self.select_object(obj)
+                self.update_overlay()
+                self.scale_slider.setEnabled(True)  # Enable scale slider
+                self.drag_start_pos = event.pos()
+                self.begin_interaction()
+                return
         elif self.rotate_mode_active:
-                for obj in self.objects:
-                    if obj['rect'].contains(click_pos):
-                        self.selected_object = obj
-                        self.rotation_start_angle = self.rotation_spinbox.value()
-                        self.redraw_canvas()
-                        return
+                obj = self.pick_object(event.pos())
+                if obj is not None:
+                    self.select_object(obj)
+                    self.rotation_start_angle = self.rotation_spinbox.value()
+                    self.update_overlay()
+                    self.begin_interaction()
+                    return
 
         elif event.button() == Qt.RightButton:
             click_pos = event.pos()
 
             # Right-click to select or deselect an object
-            for obj in self.objects:
-                if obj['rect'].contains(click_pos):
-                    self.selected_object = obj if self.selected_object != obj else None
-                    self.scale_slider.setEnabled(bool(self.selected_object))  # Enable or disable scaling
-                    self.properties_button.setVisible(bool(self.selected_object))  # Show or hide the button
-                    
-                    # Show or hide color conversion buttons
-                    is_selected = bool(self.selected_object)
-                    self.rgb_button.setVisible(is_selected)
-                    self.hsv_button.setVisible(is_selected)
-                    self.gray_button.setVisible(is_selected)
-                    self.cie_button.setVisible(is_selected)
-                    self.hls_button.setVisible(is_selected)
-                    self.ycrcb_button.setVisible(is_selected)
-                    
-                    self.gamma_button.setVisible(is_selected)
-                    self.histogram_button.setVisible(is_selected)
-                    self.bitwise_dropdown.setVisible(is_selected)
-                    self.negative_image_button.setVisible(is_selected)
-                    
-                    
-                    self.redraw_canvas()
-                    return
+            obj = self.pick_object(click_pos)
+            if obj is not None:
+                self.select_object(obj if self.selected_object is not obj else None)
+                self.scale_slider.setEnabled(bool(self.selected_object))  # Enable or disable scaling
+
+                # Show or hide properties, color conversion and filter tools
+                self.set_object_tools_visible(bool(self.selected_object))
+                
+                
+                self.update_overlay()
+                return
             self.selected_object = None  # Deselect if no object was clicked
-            self.redraw_canvas()
 
             # If no object is clicked, deselect everything
-            self.selected_object = None
+            self.select_object(None)
             self.scale_slider.setEnabled(False)
-            self.properties_button.hide() 
-            self.rgb_button.hide()
-            self.hsv_button.hide()
-            self.gray_button.hide()
-            self.cie_button.hide()
-            self.hls_button.hide()
-            self.ycrcb_button.hide()
-            self.gamma_button.hide()
-            self.histogram_button.hide()
-            self.bitwise_dropdown.hide()
-            self.negative_image_button.hide()
+            self.set_object_tools_visible(False)
             
-            self.redraw_canvas()
+            self.update_overlay()
             
+    def set_object_tools_visible(self, visible):
+        """Show or hide the selected-object tools, building them on first show."""
+        if self.object_tools is None:
+            if not visible:
+                return
+            self.build_object_tools()
+        for widget in self.object_tools:
+            widget.setVisible(visible)
+
+    def build_object_tools(self):
+        # Image Properties Button
+        self.properties_button = QPushButton("Show Properties", self)
+        self.properties_button.setGeometry(10, 480, 140, 40)  # Position below the slider
+        self.properties_button.clicked.connect(self.show_image_properties)
+
+        # Color Conversion Buttons
+        self.rgb_button = QPushButton("RGB", self)
+        self.rgb_button.setGeometry(10, 530, 60, 40)  # Position below properties button
+        self.rgb_button.clicked.connect(lambda: self.convert_color("RGB"))
+
+        self.hsv_button = QPushButton("HSV", self)
+        self.hsv_button.setGeometry(80, 530, 60, 40)
+        self.hsv_button.clicked.connect(lambda: self.convert_color("HSV"))
+
+        self.gray_button = QPushButton("GRAY", self)
+        self.gray_button.setGeometry(10, 580, 60, 40)
+        self.gray_button.clicked.connect(lambda: self.convert_color("GRAY"))
+
+        self.cie_button = QPushButton("CIE", self)
+        self.cie_button.setGeometry(80, 580, 60, 40)
+        self.cie_button.clicked.connect(lambda: self.convert_color("CIE"))
+
+        self.hls_button = QPushButton("HLS", self)
+        self.hls_button.setGeometry(10, 630, 60, 40)
+        self.hls_button.clicked.connect(lambda: self.convert_color("HLS"))
+
+        self.ycrcb_button = QPushButton("YCrCb", self)
+        self.ycrcb_button.setGeometry(80, 630, 60, 40)
+        self.ycrcb_button.clicked.connect(lambda: self.convert_color("YCrCb"))
+
+        self.gamma_button = QPushButton("Gamma Adjustment", self)
+        self.gamma_button.setGeometry(10, 680, 140, 40)
+        self.gamma_button.clicked.connect(self.adjust_gamma)
+
+        # Add a button for displaying the histogram
+        self.histogram_button = QPushButton("Show Histogram", self)
+        self.histogram_button.setGeometry(10, 730, 140, 40)  # Adjust position as needed
+        self.histogram_button.clicked.connect(self.show_histogram)
+
+        # Add the bitwise dropdown button
+        self.bitwise_dropdown = QComboBox(self)
+        self.bitwise_dropdown.setGeometry(10, 780, 140, 40)  # Adjust position below the histogram button
+        self.bitwise_dropdown.addItems(["Select Operation", "Bitwise AND", "Bitwise OR", "Bitwise XOR"])
+        self.bitwise_dropdown.currentTextChanged.connect(self.perform_bitwise_operation)
+
+        # Add Negative Image Button
+        self.negative_image_button = QPushButton("Negative Image", self)
+        self.negative_image_button.setGeometry(10, 830, 140, 40)  # Adjust position as needed
+        self.negative_image_button.clicked.connect(self.negative_image)
+
+        self.object_tools = [
+            self.properties_button, self.rgb_button, self.hsv_button, self.gray_button, self.cie_button,
+            self.hls_button, self.ycrcb_button, self.gamma_button, self.histogram_button, self.bitwise_dropdown,
+            self.negative_image_button
+        ]
+
     def edit_selected_object(self):
         if self.selected_object:
             color = QColorDialog.getColor(initial=self.selected_color, parent=self, title="Select New Color")
             if color.isValid():
-                painter = QPainter(self.selected_object['pixmap'])
-                painter.setBrush(color)
-                painter.setPen(Qt.NoPen)
-                painter.drawRect(self.selected_object['pixmap'].rect())
-                painter.end()
-                self.redraw_canvas()
+                self.push_object_op(self.selected_object, ('fill', color.rgba()))
                 
     def delete_selected_object(self):
         if self.selected_object:
-            self.objects.remove(self.selected_object)
-            self.selected_object = None
+            # By identity: remove() would take the first object with equal pixels
+            self.objects = [obj for obj in self.objects if obj is not self.selected_object]
+            self.object_index.remove(self.selected_object)
+            self.transform_cache.discard(self.transform_keys.pop(id(self.selected_object), None))
+            self.invalidate_object(self.selected_object)
+            self.select_object(None)
             
             self.redraw_canvas()
 
@@ -1551,116 +3097,103 @@ class CanvasWindow(QMainWindow):
             self.change_pixel_color_button.setStyleSheet("")
             
     def apply_color_to_pixel_group(self, start_pos):
-        # Get the canvas QImage
-        qt_image = self.canvas.toImage()
-        width, height = qt_image.width(), qt_image.height()
-
-        # Convert the start position to QImage coordinates
         x, y = start_pos.x(), start_pos.y()
-
-        # Get the color of the clicked pixel
-        target_color = qt_image.pixelColor(x, y)
+        if not self.document_rect().contains(x, y):
+            return
 
         # Open the color picker dialog
         new_color = QColorDialog.getColor(initial=self.selected_color, parent=self, title="Choose New Color")
         if not new_color.isValid():
             return  # User canceled the color selection
 
-        # Use a stack for flood-fill
-        stack = [(x, y)]
-        while stack:
-            cx, cy = stack.pop()
-            if 0 <= cx < width and 0 <= cy < height and qt_image.pixelColor(cx, cy) == target_color:
-                # Change the pixel color
-                qt_image.setPixelColor(cx, cy, new_color)
-
-                # Add neighboring pixels to the stack
-                stack.extend([(cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)])
-
-        # Update the canvas with the modified image
-        self.canvas = QPixmap.fromImage(qt_image)
-        self.canvas_label.setPixmap(self.canvas)
+        # Render the canvas straight to the 3 channels cv2.floodFill reads, then fill on the worker pool
+        self.flush_redraw()
+        image = self.render_document(image_format=QImage.Format_RGB888)
+        layer = self.pixel_layer
+        tolerance = self.fill_tolerance_spinbox.value()
+        connectivity = 8 if self.fill_connectivity_dropdown.currentText() == "8-way" else 4
+        smooth = self.fill_smooth_checkbox.isChecked()
+
+        def fill(job):
+            return self.flood_fill(job, image, x, y, tolerance, connectivity, smooth)
+
+        def publish(result):
+            # Record the fill in the pixel layer and repaint only what it changed
+            if result is not None and self.pixel_layer is layer:
+                left, top, coverage = result
+                self.modify_pixels(layer.fill_mask(left, top, coverage, new_color))
+
+        self.jobs.submit(('fill', id(image)), fill, on_done=publish)
+
+    def flood_fill(self, job, image, x, y, tolerance=0, connectivity=4, smooth=False):
+        """Flood fill an RGB888 image from (x, y) and return (left, top, coverage).
+
+        Pixels join the fill while every channel is within tolerance of the
+        seed pixel. coverage is a uint8 0..255 array over the fill's
+        bounding rect; with smooth its edge is feathered by one pixel.
+        Touches no shared state, so it can run on a pool thread; returns
+        None if job was cancelled.
+        """
+        width, height = image.width(), image.height()
+        # cv2 takes the strided view as is, but only if it is writable; only the mask is written
+        pixels = np.asarray(ImageBuffer(image, writable=True))
+
+        mask = np.zeros((height + 2, width + 2), np.uint8)
+        flags = connectivity | cv2.FLOODFILL_MASK_ONLY | cv2.FLOODFILL_FIXED_RANGE | (255 << 8)
+        diff = (tolerance,) * 3
+        cv2.floodFill(pixels, mask, (x, y), 0, diff, diff, flags)
+        if job is not None and job.cancelled:
+            return None
+        mask = mask[1:-1, 1:-1]
+
+        left, top, fill_width, fill_height = cv2.boundingRect(mask)
+        if smooth:
+            left, top = max(left - 1, 0), max(top - 1, 0)
+            fill_width = min(fill_width + 2, width - left)
+            fill_height = min(fill_height + 2, height - top)
+        coverage = mask[top:top + fill_height, left:left + fill_width]
+        if smooth:
+            coverage = np.maximum(cv2.GaussianBlur(coverage, (3, 3), 0), coverage)
+        return left, top, coverage
 
-            
     def modify_pixel_color(self, x, y, color):
-        if not self.canvas:
-            return
-
-        # Convert QPixmap to QImage for direct pixel manipulation
-        image = self.canvas.toImage()
-        if not image.valid(x, y):
-            return
-
-        # Change a single pixel's color
-        image.setPixelColor(x, y, color)
-
-        # Update the canvas with the modified image
-        self.canvas = QPixmap.fromImage(image)
-        self.canvas_label.setPixmap(self.canvas)
+        """Set one pixel; returns the dirty rect."""
+        return self.modify_pixels(self.pixel_layer.set_points([x], [y], color))
 
     def modify_pixel_group(self, x_start, y_start, x_end, y_end, color):
-        if not self.canvas:
-            return
+        """Fill an inclusive pixel rectangle; returns the dirty rect."""
+        rect = QRect(QPoint(x_start, y_start), QPoint(x_end, y_end))
+        return self.modify_pixels(self.pixel_layer.fill_rects([rect], color))
 
-        # Convert QPixmap to QImage
-        image = self.canvas.toImage()
+    def modify_pixels(self, dirty_rect):
+        """Repaint the area a pixel_layer edit reported and pass the rect on.
 
-        # Loop through the specified region
-        for x in range(x_start, x_end + 1):
-            for y in range(y_start, y_end + 1):
-                if image.valid(x, y):
-                    image.setPixelColor(x, y, color)
-
-        # Update the canvas
-        self.canvas = QPixmap.fromImage(image)
-        self.canvas_label.setPixmap(self.canvas)
+        Bulk edits go straight to the layer, e.g.
+        self.modify_pixels(self.pixel_layer.fill_mask(left, top, mask, color)).
+        """
+        if not dirty_rect.isEmpty():
+            self.schedule_redraw(dirty_rect)
+        return dirty_rect
 
 
     def mouse_move_event(self, event):
+        event = self.document_event(event)
         if self.is_drawing:
             self.draw(event)
         elif event.buttons() & Qt.MiddleButton and hasattr(self, 'pan_start_pos'):
-            delta = event.pos() - self.pan_start_pos
+            delta = (event.pos() - self.pan_start_pos) * self.canvas_scale  # Scroll bars move in view pixels
             self.scroll_area.horizontalScrollBar().setValue(self.scroll_area.horizontalScrollBar().value() - delta.x())
             self.scroll_area.verticalScrollBar().setValue(self.scroll_area.verticalScrollBar().value() - delta.y())
             self.pan_start_pos = event.pos()
         elif self.is_shape_mode and self.start_point:
-            # Create a temporary pixmap to preview the shape
-            temp_canvas = QPixmap(self.canvas)
-            painter = QPainter(temp_canvas)
-            pen = QPen(self.brush_color, self.brush_size, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-            painter.setPen(pen)
-
-            end_point = event.pos()
-
-            # Draw the selected shape on the temporary canvas
-            if self.current_shape == "Circle":
-                radius = int(((end_point.x() - self.start_point.x())**2 + (end_point.y() - self.start_point.y())**2)**0.5)
-                painter.drawEllipse(self.start_point, radius, radius)
-            elif self.current_shape == "Rectangle":
-                painter.drawRect(QRect(self.start_point, end_point))
-            elif self.current_shape == "Square":
-                side = min(abs(end_point.x() - self.start_point.x()), abs(end_point.y() - self.start_point.y()))
-                painter.drawRect(self.start_point.x(), self.start_point.y(), side, side)
-            elif self.current_shape == "Line":
-                painter.drawLine(self.start_point, end_point)
-            elif self.current_shape == "Triangle":
-                points = [
-                    self.start_point,
-                    QPoint(self.start_point.x(), end_point.y()),
-                    QPoint(end_point.x(), end_point.y())
-                ]
-                painter.drawPolygon(*points)
-
-            painter.end()
-
-            # Display the temporary canvas on the QLabel
-            self.canvas_label.setPixmap(temp_canvas)
+            # The preview is painted over the canvas by paint_overlay
+            self.shape_preview_end = event.pos()
+            self.update_overlay()
         elif self.crop_mode_active and self.crop_start_pos:
             # Update the crop rectangle as the mouse is dragged
             end_pos = event.pos()
             self.crop_rect = QRect(self.crop_start_pos, end_pos).normalized()
-            self.redraw_canvas()
+            self.update_overlay()
         elif self.rotate_mode_active and self.selected_object:
             # Calculate rotation angle based on mouse movement
             dx = event.pos().x() - (self.selected_object['rect'].x() + self.selected_object['rect'].width() / 2)
@@ -1671,6 +3204,7 @@ class CanvasWindow(QMainWindow):
         elif self.drag_mode_active and self.drag_start_pos and self.selected_object:
             dx = event.pos().x() - self.drag_start_pos.x()
             dy = event.pos().y() - self.drag_start_pos.y()
+            dirty_rect = self.object_damage(self.selected_object)
 
             # Update the position of the selected object
             self.selected_object['rect'].moveTo(
@@ -1681,10 +3215,11 @@ class CanvasWindow(QMainWindow):
             self.selected_object['y'] += dy
 
             self.drag_start_pos = event.pos()
-            self.redraw_canvas()
+            self.object_changed(self.selected_object, dirty_rect)
 
 
     def mouse_release_event(self, event):
+        event = self.document_event(event)
         if self.crop_mode_active and event.button() == Qt.LeftButton:
             if self.crop_rect and not self.crop_rect.isEmpty():
                 # Confirm crop and apply it
@@ -1694,10 +3229,12 @@ class CanvasWindow(QMainWindow):
             self.scroll_area.setCursor(Qt.ArrowCursor)
         elif self.drag_mode_active and event.button() == Qt.LeftButton:
             self.drag_start_pos = None
+            self.end_interaction()
         elif self.rotate_mode_active and event.button() == Qt.LeftButton:
             self.rotation_start_angle = None
+            self.end_interaction()
         elif self.is_drawing and event.button() == Qt.LeftButton:
-            self.last_point = None
+            self.stop_drawing(event)
             
         elif self.is_shape_mode and self.start_point and event.button() == Qt.LeftButton:
             end_point = event.pos()
@@ -1729,42 +3266,27 @@ class CanvasWindow(QMainWindow):
                 path.closeSubpath()
 
             # Save the shape to elements list
-            self.elements.append({'type': 'shape', 'pen': pen, 'path': path})
+            self.commit_element({'type': 'shape', 'pen': pen, 'path': path})
 
-            # Draw the shape
-            painter = QPainter(self.canvas)
-            painter.setPen(pen)
-            painter.drawPath(path)
-            painter.end()
-
-            # Update the canvas
-            self.canvas_label.setPixmap(self.canvas)
+            # Drop the preview; commit_element already painted the shape
             self.start_point = None
+            self.shape_preview_end = None
+            self.update_overlay()
 
             
     def keyPressEvent(self, event):
         if self.is_text_mode and self.text_start_point:
             if event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter:
                 # Save text to elements list
-                font = QFont(self.font_style_dropdown.currentText(), self.font_size_spinbox.value())
-                font.setBold(self.text_bold)
-                font.setItalic(self.text_italic)
-                font.setUnderline(self.text_underline)
+                font = self.preview_font()
                 pen = QPen(self.selected_color)
 
-                self.elements.append({'type': 'text', 'font': font, 'pen': pen, 'position': self.text_start_point, 'text': self.current_text})
-
-                # Finalize text on canvas
-                painter = QPainter(self.canvas)
-                painter.setFont(font)
-                painter.setPen(pen)
-                painter.drawText(self.text_start_point, self.current_text)
-                painter.end()
+                self.commit_element({'type': 'text', 'font': font, 'pen': pen, 'position': self.text_start_point, 'text': self.current_text})
 
-                # Update the canvas
-                self.canvas_label.setPixmap(self.canvas)
+                # Drop the preview; commit_element already painted the text
                 self.current_text = ""
                 self.text_start_point = None  # Reset the start point for text
+                self.update_overlay()
 
             elif event.key() == Qt.Key_Backspace:
                 # Handle backspace
@@ -1780,107 +3302,67 @@ class CanvasWindow(QMainWindow):
             return  # No object selected or no crop rectangle defined
 
         obj = self.selected_object
+        dirty_rect = self.object_damage(obj).united(self.crop_rect)
+        size = self.object_size(obj)
         intersected_rect = self.crop_rect.translated(-obj['rect'].x(), -obj['rect'].y()).intersected(
-            QRect(0, 0, obj['pixmap'].width(), obj['pixmap'].height())
+            QRect(QPoint(), size)
         )
 
         if intersected_rect.isEmpty():
             return  # No valid crop area
 
-        # Crop the pixmap
-        cropped_pixmap = obj['pixmap'].copy(intersected_rect)
-        obj['pixmap'] = cropped_pixmap
-        obj['rect'] = QRect(obj['rect'].x() + intersected_rect.x(), obj['rect'].y() + intersected_rect.y(),
-                            cropped_pixmap.width(), cropped_pixmap.height())
-
-        # Clear crop state and redraw
+        # Clear crop state, then crop through the op stack
         self.crop_rect = None
-        self.redraw_canvas()
+        obj['rect'].translate(intersected_rect.x(), intersected_rect.y())
+        self.push_object_op(obj, ('crop', (intersected_rect.x() / size.width(), intersected_rect.y() / size.height(),
+                                           intersected_rect.width() / size.width(), intersected_rect.height() / size.height())))
+        self.schedule_redraw(dirty_rect.adjusted(-1, -1, 1, 1))
         
     def show_histogram(self):
-        if not self.selected_object:
+        if self.histogram_dock is None:
+            self.histogram_view = HistogramView(self)
+            self.histogram_dock = QDockWidget("Histogram", self)
+            self.histogram_dock.setWidget(self.histogram_view)
+            self.addDockWidget(Qt.RightDockWidgetArea, self.histogram_dock)
+            self.histogram_dock.visibilityChanged.connect(lambda visible: visible and self.update_histogram())
+        self.histogram_dock.show()
+        self.update_histogram()
+
+    def update_histogram(self):
+        """Show the selected object's histogram, counting it on the worker pool if it is not cached."""
+        if self.histogram_dock is None or not self.histogram_dock.isVisible():
             return
+        obj = self.selected_object
+        if obj is None:
+            self.histogram_key = None
+            self.histogram_view.set_counts(None)
+            return
+        if obj['image'] is None and 'proxy' in obj:
+            return  # Still being evaluated; its publish comes back through here
+        image = self.object_image(obj)
+        key = image.cacheKey()
+        if key == self.histogram_key:
+            return
+        self.histogram_key = key
+        counts = self.histogram_cache.get(key)
+        if counts is not None:
+            self.histogram_cache.move_to_end(key)
+            self.histogram_view.set_counts(counts)
+            return
+        self.jobs.submit(('histogram',), channel_histograms, image,
+                         on_done=lambda counts: self.publish_histogram(key, counts))
 
-        # Get the pixmap of the selected object
-        pixmap = self.selected_object['pixmap']
-        qt_image = pixmap.toImage()
-
-        # Convert QImage to OpenCV format
-        qt_image = qt_image.convertToFormat(QImage.Format_RGB32)
-        width, height = qt_image.width(), qt_image.height()
-        ptr = qt_image.bits()
-        ptr.setsize(qt_image.byteCount())
-        cv_image = np.array(ptr).reshape((height, width, 4))[:, :, :3]  # Extract RGB channels
-
-        # Call the provided histogram function
-        self.display_histogram(cv_image)
-
-    def display_histogram(self, image):
-        """Display histograms for the RGB channels of an image."""
-        # Convert to RGB
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Calculate histograms
-        hist1 = cv2.calcHist([image], [0], None, [256], [0, 256])  # Red
-        hist2 = cv2.calcHist([image], [1], None, [256], [0, 256])  # Green
-        hist3 = cv2.calcHist([image], [2], None, [256], [0, 256])  # Blue
-
-        # Titles for plots
-        titles = ["Original Image", "Red Histogram", "Green Histogram", "Blue Histogram", "All Channels"]
-        
-        # Create the plot
-        plt.figure(figsize=(15, 5))
-        
-        # Display the image
-        plt.subplot(1, 5, 1)
-        plt.title(titles[0])
-        plt.imshow(image)
-        plt.axis("off")
-        
-        # Display histograms
-        for i, (hist, color) in enumerate(zip([hist1, hist2, hist3], ['r', 'g', 'b']), start=2):
-            plt.subplot(1, 5, i)
-            plt.title(titles[i-1])
-            plt.plot(hist, color=color)
-            plt.xlim([0, 256])
-        
-        # Combined histogram
-        plt.subplot(1, 5, 5)
-        plt.title(titles[4])
-        plt.plot(hist1, color='r')
-        plt.plot(hist2, color='g')
-        plt.plot(hist3, color='b')
-        plt.xlim([0, 256])
-        
-        # Show the plot
-        plt.tight_layout()
-        plt.show()
+    def publish_histogram(self, key, counts):
+        self.histogram_cache[key] = counts
+        while len(self.histogram_cache) > 64:
+            self.histogram_cache.popitem(last=False)
+        if key == self.histogram_key:
+            self.histogram_view.set_counts(counts)
 
             
     def update_text_preview(self):
-        # Create a temporary canvas to overlay the text preview
-        temp_canvas = QPixmap(self.canvas)
-        painter = QPainter(temp_canvas)
-
-        # Draw the text box as a rectangle
-        if self.text_start_point:
-            pen = QPen(Qt.gray, 1, Qt.DashLine)
-            painter.setPen(pen)
-            painter.drawRect(QRect(self.text_start_point, QPoint(self.text_start_point.x() + 200, self.text_start_point.y()-20)))
-
-        # Set up font style
-        font = QFont(self.font_style_dropdown.currentText(), self.font_size_spinbox.value())
-        font.setBold(self.text_bold)
-        font.setItalic(self.text_italic)
-        font.setUnderline(self.text_underline)
-        painter.setFont(font)
-
-        # Draw the preview text
-        painter.drawText(self.text_start_point, self.current_text)
-        painter.end()
-
-        # Update the QLabel with the temporary canvas
-        self.canvas_label.setPixmap(temp_canvas)
+        # The preview is painted over the canvas by paint_overlay
+        self.update_overlay()
             
     def toggle_text_mode(self):
         self.is_text_mode = self.text_button.isChecked()
@@ -1891,6 +3373,7 @@ class CanvasWindow(QMainWindow):
             self.text_button.setText("Enable Text")
             self.text_button.setStyleSheet("")
             self.text_start_point = None # Reset the starting point for text input
+            self.update_overlay()
 
     def toggle_bold(self):
         self.text_bold = self.bold_button.isChecked()
@@ -1945,62 +3428,89 @@ class CanvasWindow(QMainWindow):
     def start_drawing(self, event):
         if self.is_drawing:
             self.last_point = event.pos()
+            # Points of the stroke in progress, flattened as x0, y0, x1, y1, ...
+            self.current_stroke = {
+                'type': 'drawing',
+                'pen': self.stroke_pen(),
+                'points': [float(self.last_point.x()), float(self.last_point.y())],
+            }
+
+    def stroke_pen(self):
+        pen = QPen(self.brush_color, self.brush_size, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+
+        # Handle different tools
+        if self.current_tool == "Eraser":
+            # Eraser behavior: use white color and a larger pen size
+            pen.setColor(Qt.white)
+        elif self.current_tool == "Pen":
+            # Pen behavior: keep current brush color and small size
+            pen.setWidth(self.brush_size)
+            color = QColor(self.selected_color)
+            pen.setColor(color)
+        elif self.current_tool == "Marker":
+            # Marker behavior: semi-transparent strokes
+            pen.setWidth(self.brush_size * 2)
+            color = QColor(self.selected_color)  # Copy the current brush color
+            pen.setColor(color)
+        elif self.current_tool == "Highlighter":
+            # Highlighter behavior: larger and semi-transparent
+            pen.setWidth(self.brush_size * 2)
+            color = QColor(self.selected_color) # Copy the current brush color
+            color.setAlpha(128)  # Semi-transparent
+            pen.setColor(color)
+        elif self.current_tool == "Pencil":
+            # Pencil behavior: thin and dark gray
+            pen.setWidth(self.brush_size // 2)
+            pen.setColor(Qt.darkGray)
+        return pen
+
+    def build_stroke_path(self, points):
+        """Build a polyline QPainterPath from an (N, 2) point array."""
+        return polyline_path(points)
 
     def draw(self, event):
-        if self.is_drawing and self.last_point:
-            pen = QPen(self.brush_color, self.brush_size, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-
-            # Handle different tools
-            if self.current_tool == "Eraser":
-                # Eraser behavior: use white color and a larger pen size
-                pen.setColor(Qt.white)
-            elif self.current_tool == "Pen":
-                # Pen behavior: keep current brush color and small size
-                pen.setWidth(self.brush_size)
-                color = QColor(self.selected_color)
-                pen.setColor(color)
-            elif self.current_tool == "Marker":
-                # Marker behavior: semi-transparent strokes
-                pen.setWidth(self.brush_size * 2)
-                color = QColor(self.selected_color)  # Copy the current brush color
-                pen.setColor(color)
-            elif self.current_tool == "Highlighter":
-                # Highlighter behavior: larger and semi-transparent
-                pen.setWidth(self.brush_size * 2)
-                color = QColor(self.selected_color) # Copy the current brush color
-                color.setAlpha(128)  # Semi-transparent
-                pen.setColor(color)
-            elif self.current_tool == "Pencil":
-                # Pencil behavior: thin and dark gray
-                pen.setWidth(self.brush_size // 2)
-                pen.setColor(Qt.darkGray)
-
-            # Create a QPainterPath for the drawing
-            path = QPainterPath()
-            path.moveTo(self.last_point)
-            path.lineTo(event.pos())
-
-            # Save the drawing to the elements list
-            self.elements.append({'type': 'drawing', 'pen': pen, 'path': path})
+        if self.is_drawing and self.last_point and self.current_stroke:
+            pen = self.current_stroke['pen']
+            end_point = event.pos()
+            self.current_stroke['points'].extend((float(end_point.x()), float(end_point.y())))
 
-            # Draw the current segment
-            painter = QPainter(self.canvas)
-            painter.setPen(pen)
-            painter.drawPath(path)
-            painter.end()
+            # Paint only the new segment onto the committed tiles; the stroke
+            # becomes a single element when the mouse is released
+            start_point = self.last_point
+            margin = pen.width() // 2 + 2
+            segment_rect = QRect(start_point, end_point).normalized().adjusted(-margin, -margin, margin, margin)
 
-            # Update the canvas
-            self.canvas_label.setPixmap(self.canvas)
+            def paint_segment(painter):
+                painter.setPen(pen)
+                painter.drawLine(start_point, end_point)
+            self.element_tiles.draw(segment_rect, paint_segment)
+            self.schedule_redraw(segment_rect)
 
             # Update the last point
-            self.last_point = event.pos()
+            self.last_point = end_point
 
     def stop_drawing(self, event):
+        stroke = self.current_stroke
+        self.current_stroke = None
         self.last_point = None
-        
+        if stroke and len(stroke['points']) >= 4:
+            points = np.array(stroke['points'], dtype=np.float32).reshape(-1, 2)
+            # Already painted segment by segment, so just store it
+            element = {'type': 'drawing', 'pen': stroke['pen'], 'points': points,
+                       'path': self.build_stroke_path(points)}
+            self.elements.append(element)
+            bounds = self.element_bounds(element)
+            self.element_index.insert(element, bounds)
+
+            # Overlapping translucent segments darken at the joints, so repaint
+            # the stroke's area once from the finished path
+            if element['pen'].color().alpha() < 255:
+                self.rebuild_elements_layer(bounds)
+                self.schedule_redraw(bounds)
+
     def highlight_selected_object(self):
         if self.selected_object:
-            self.redraw_canvas()  # Redraw canvas with all objects and highlights
+            self.update_overlay()  # Outline the selection
 
 
 class CanvasApp:
@@ -2010,23 +3520,28 @@ class CanvasApp:
         self.main_window = None
 
     def start(self):
-        splash_image_path = "fairy tail.png"
+        splash_image_path = asset_path(SPLASH_IMAGE)
         try:
             self.splash = SplashScreen(splash_image_path, width=600, height=500)
             self.splash.show()
         except FileNotFoundError as e:
             print(e)
             sys.exit(1)
+        # Every window uses the splash artwork as its icon; reuse the decoded copy
+        self.app.setWindowIcon(QIcon(self.splash.pixmap()))
+        mark_startup("splash shown")
 
-        QTimer.singleShot(3000, self.show_canvas_dialog)
+        # Move on as soon as the event loop is running and the splash has painted
+        QTimer.singleShot(0, self.show_canvas_dialog)
         sys.exit(self.app.exec_())
 
     def show_canvas_dialog(self):
+        dialog = CanvasSettingsDialog()
         if self.splash:
             self.splash.close()
             self.splash = None
+        mark_startup("settings dialog ready")
 
-        dialog = CanvasSettingsDialog()
         if dialog.exec_() == QDialog.Accepted:
             project_name, width, height = dialog.get_canvas_settings()
             self.show_main_window(width, height)
@@ -2034,8 +3549,19 @@ class CanvasApp:
             sys.exit(0)
 
     def show_main_window(self, width, height):
+        started = time.perf_counter()
         self.main_window = CanvasWindow(width, height)
         self.main_window.show()
+        self.app.processEvents()  # First paint
+        startup_timings["window build"] = time.perf_counter() - started
+        mark_startup("window ready")
+        self.report_startup()
+
+    def report_startup(self):
+        # Set FAIRY_PAINTING_TIMINGS=1 to print where startup time went
+        if os.environ.get("FAIRY_PAINTING_TIMINGS"):
+            for name, seconds in startup_timings.items():
+                print(f"{name}: {seconds * 1000:.1f} ms")
 
 
 if __name__ == "__main__":